@@ -0,0 +1,197 @@
+"""Precompiled, hot-reloadable blocked-game matcher for the Variety Friday bot."""
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]')
+
+class BlockMatch(NamedTuple):
+    """Which blocklist rule fired for a name."""
+    rule: str      # "keyword" or "single_letter"
+    entry: str     # the blocklist entry as written in the config file
+
+def normalize_name(name: str, leet_table: Dict[int, str]) -> str:
+    """Lowercase, undo leetspeak and drop everything but letters and digits."""
+    return _NON_ALNUM.sub('', name.lower().translate(leet_table))
+
+class _Automaton:
+    """Aho-Corasick automaton over normalized keywords.
+
+    Matching walks the name once, so the cost depends on the name's length
+    rather than on how many keywords there are.
+    """
+
+    def __init__(self, keywords: Dict[str, str]):
+        # keywords maps normalized keyword -> original entry
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]
+        for pattern, entry in keywords.items():
+            if pattern:
+                self._add(pattern, entry)
+        self._link()
+
+    def _add(self, pattern: str, entry: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = nxt
+        self._output[state] = entry
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # A state also matches whatever its fail state matches
+                if self._output[nxt] is None:
+                    self._output[nxt] = self._output[self._fail[nxt]]
+
+    def search(self, text: str) -> Optional[str]:
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state] is not None:
+                return output[state]
+        return None
+
+class BlocklistMatcher:
+    """Matches game names against the blocklist file.
+
+    The file is compiled once and re-read when its modification time
+    changes (checked at most every ``reload_interval`` seconds).
+    """
+
+    def __init__(self, path: str = "blocklist.json", reload_interval: float = 5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.leet_table: Dict[int, str] = {}
+        self._single_letters = frozenset()
+        self._automaton = _Automaton({})
+        self.reload()
+
+    def reload(self) -> bool:
+        """(Re)compile the blocklist. Keeps the previous rules on error."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            leet_table = str.maketrans(config.get("leet_map", {}))
+            keywords = {normalize_name(k, leet_table): k for k in config.get("keywords", [])}
+            single_letters = frozenset(s.lower() for s in config.get("single_letters", []))
+            automaton = _Automaton(keywords)
+        except Exception as e:
+            logger.error(f"Error loading blocklist from {self.path}: {e}")
+            return False
+
+        self.leet_table = leet_table
+        self._single_letters = single_letters
+        self._automaton = automaton
+        self._mtime = mtime
+        logger.info(f"Loaded {len(keywords)} blocked keywords from {self.path}")
+        return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def normalize(self, name: str) -> str:
+        return normalize_name(name, self.leet_table)
+
+    def match(self, name: str) -> Optional[BlockMatch]:
+        """Return the rule that blocks ``name``, or None if it's allowed."""
+        self._maybe_reload()
+        stripped = name.strip().lower()
+        if stripped in self._single_letters:
+            return BlockMatch("single_letter", stripped)
+        entry = self._automaton.search(self.normalize(name))
+        if entry is not None:
+            return BlockMatch("keyword", entry)
+        return None
+
+# -------------------------
+# Benchmark: python blocklist.py
+# -------------------------
+def _legacy_is_blocked_game(name: str) -> bool:
+    """The original main.is_blocked_game, kept for comparison."""
+    blocked_keywords = [
+        "death note", "dn", "dnkw", "death note killer within",
+        "cooked", "washed", "kira", "downtown", "toy town", "toytown", "note"
+    ]
+    leet_map = str.maketrans({'4': 'a','@': 'a','3': 'e','1': 'i','!': 'i','0': 'o','5': 's','$': 's','7': 't'})
+    name_normalized = name.lower().translate(leet_map)
+    name_clean = re.sub(r'[^a-z0-9]', '', name_normalized)
+    if re.fullmatch(r'\s*L\s*', name, re.IGNORECASE):
+        return True
+    for word in blocked_keywords:
+        word_clean = re.sub(r'[^a-z0-9]', '', word.lower())
+        if word_clean in name_clean:
+            return True
+    return False
+
+def _benchmark():
+    import random
+    import string
+    import tempfile
+    import timeit
+
+    names = ["Among Us", "Jackbox Party Pack 7", "D3ath N0te", "Lethal Company", "Toy-Town", "L", "Phasmophobia"]
+    n = 20000
+
+    def per_call(fn) -> float:
+        return timeit.timeit(lambda: [fn(x) for x in names], number=n // len(names)) / n * 1e6
+
+    def matcher_for(keywords: List[str]) -> BlocklistMatcher:
+        with open("blocklist.json", 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        config["keywords"] = keywords
+        with tempfile.NamedTemporaryFile('w', suffix=".json", delete=False, encoding='utf-8') as f:
+            json.dump(config, f)
+        matcher = BlocklistMatcher(f.name)
+        os.unlink(f.name)
+        return matcher
+
+    with open("blocklist.json", 'r', encoding='utf-8') as f:
+        base = json.load(f)["keywords"]
+    rng = random.Random(0)
+    big = base + ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12))) for _ in range(5000)]
+
+    assert all(bool(matcher_for(base).match(x)) == _legacy_is_blocked_game(x) for x in names)
+    print(f"legacy is_blocked_game, {len(base)} keywords: {per_call(_legacy_is_blocked_game):.2f} us/call")
+    for keywords in (base, big):
+        matcher = matcher_for(keywords)
+        print(f"BlocklistMatcher, {len(keywords)} keywords: {per_call(matcher.match):.2f} us/call")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    _benchmark()
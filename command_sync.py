@@ -0,0 +1,50 @@
+"""Hash-gated application command sync for the Variety Friday bot."""
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import discord
+from discord import app_commands
+
+logger = logging.getLogger(__name__)
+
+def _command_payload(command, tree: app_commands.CommandTree) -> Dict[str, Any]:
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()  # discord.py < 2.4 takes no tree argument
+
+def tree_payload(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake]) -> List[Dict[str, Any]]:
+    """The JSON the next sync would upload, in a stable order."""
+    return sorted((_command_payload(c, tree) for c in tree.get_commands(guild=guild)), key=lambda p: p["name"])
+
+def tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake]) -> str:
+    """Stable hash of the command tree as Discord would receive it."""
+    scope = {"guild": guild.id if guild else None, "commands": tree_payload(tree, guild)}
+    return hashlib.sha256(json.dumps(scope, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+async def sync_if_changed(bot: discord.Client, tree: app_commands.CommandTree, guild_id: Optional[int], stored_hash: Optional[str]) -> str:
+    """Sync the command tree only if it differs from the last synced one.
+
+    With ``guild_id`` the global commands are copied to that guild, which
+    makes changes show up instantly, and any old global registrations are
+    cleared so they don't appear twice. Returns the hash to store.
+    """
+    started = time.perf_counter()
+    guild = discord.Object(id=guild_id) if guild_id else None
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    current = tree_hash(tree, guild)
+    if current == stored_hash:
+        logger.info(f"Command tree unchanged, skipped sync ({(time.perf_counter() - started) * 1000:.1f}ms)")
+        return current
+
+    synced = await tree.sync(guild=guild)
+    if guild is not None:
+        # Previously the tree was synced globally; drop those copies
+        await bot.http.bulk_upsert_global_commands(bot.application_id, payload=[])
+    scope = f"guild {guild_id}" if guild is not None else "global"
+    logger.info(f"Synced {len(synced)} commands to {scope} in {time.perf_counter() - started:.2f}s")
+    return current
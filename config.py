@@ -26,10 +26,77 @@ VOICE_CHANNEL_ID = 1404143716234432714  # Voice channel for the event
 EVENT_NAME = "Variety Friday"
 EVENT_DESCRIPTION = "Join us for Variety Friday! 🎮"
 EVENT_DURATION_HOURS = 6
+EVENT_WEEKDAY = 4      # Monday = 0 ... Friday = 4
 EVENT_START_HOUR = 21  # 9 PM UK time
 TIMEZONE = "Europe/London"
+EVENT_HORIZON_WEEKS = 8  # Occurrences computed ahead; also the most /createevent makes at once
+
+# -------------------------
+# Automation
+# -------------------------
+SCHEDULE_ENABLED = False   # Run the weekly stages below automatically
+SCHEDULE_CHANNEL_ID = 0    # Channel the automated announcements are posted in
+SCHEDULE_STAGES = {        # Minutes relative to the event start (negative = before); runs in this order on ties
+    "createevent": -6 * 24 * 60,
+    "register": -6 * 24 * 60,
+    "reminder": -4 * 60,
+    "startvote": -2 * 60,
+    "endvote": -15,
+    "startevent": 0,
+}
+
+# -------------------------
+# Blocked games
+# -------------------------
+BLOCKLIST_FILE = "blocklist.json"  # Keywords, leet map and single-letter rules; hot-reloaded
 
 # -------------------------
 # Limits
 # -------------------------
-MAX_VOTING_OPTIONS = 10
+MAX_VOTING_OPTIONS = 10             # Reaction voting (one number emoji per option)
+MAX_COMPONENT_VOTING_OPTIONS = 125  # Select-menu voting (5 menus of 25)
+
+# -------------------------
+# Voting
+# -------------------------
+VOTING_MODE = "reactions"  # "reactions", or "components" (select menus; raises the game cap to MAX_COMPONENT_VOTING_OPTIONS)
+VOTING_METHOD = "plurality"  # "plurality", "approval" or "irv" (instant-runoff, ranked by pick order)
+VOTING_AUTO_TIEBREAK = True  # Settle ties when counting instead of running a tiebreak round
+VOTE_TALLY_MODE = "live"     # "live" (in-memory tally) or "exact" (re-read every reaction when counting)
+VOTE_EMBED_REFRESH_SECONDS = 5.0  # Min seconds between live standings edits of the vote embed (0 disables)
+VOTE_MULTI_POLICY = "first"  # Exact plurality tallies: "first", "drop" or "split" for users who reacted to several options
+
+# -------------------------
+# Direct messages
+# -------------------------
+DM_CONCURRENCY = 5   # DMs in flight at once during a fan-out
+DM_MAX_RETRIES = 3   # Retries for rate-limited (429) or 5xx DM sends
+DM_OUTBOX_WORKERS = 2        # Workers draining the registration DM outbox
+DM_OUTBOX_PER_SECOND = 5.0   # Max outbox DMs per second across all workers
+
+# -------------------------
+# Health and metrics server
+# -------------------------
+HEALTH_HOST = "0.0.0.0"
+HEALTH_PORT = 8080          # Serves /, /healthz and /metrics (Prometheus)
+HEALTH_MAX_LATENCY = 10.0   # /healthz reports unavailable above this heartbeat latency (seconds)
+
+# -------------------------
+# Profiling
+# -------------------------
+PROFILE_DIR = "profiles"          # Collapsed-stack files from /profile
+PROFILE_INTERVAL = 0.005          # Seconds between profiler samples
+PROFILE_HTTP_TOKEN = os.environ.get("PROFILE_TOKEN")  # Enables POST /debug/profile when set
+LOOP_LAG_THRESHOLD = 0.25         # Log the loop thread's stack when a callback blocks this long
+
+# -------------------------
+# Storage
+# -------------------------
+DATA_FILE = "bot_data.json"
+DATA_WRITE_BEHIND = True      # Coalesce writes instead of saving on every change
+DATA_FLUSH_INTERVAL = 2.0     # Seconds between background flushes
+DATA_FLUSH_BATCH_SIZE = 50    # Flush early once this many changes are pending
+DATA_JOURNAL = False           # Append changes to a journal instead of rewriting the file
+DATA_JOURNAL_COMPACT_BYTES = 64 * 1024  # Fold the journal into the snapshot past this size
+DATA_BACKEND = "json"         # "json" or "sqlite"
+DATA_SQLITE_FILE = "bot_data.db"
@@ -0,0 +1,28 @@
+"""Confirm/cancel buttons for commands that need a second look."""
+from typing import Awaitable, Callable
+
+import discord
+
+class ConfirmView(discord.ui.View):
+    """Two buttons under an ephemeral prompt.
+
+    Confirming removes the buttons and calls ``on_confirm`` with the button
+    interaction, whose response is already used, so it should answer through
+    ``interaction.followup``.
+    """
+
+    def __init__(self, label: str, on_confirm: Callable[[discord.Interaction], Awaitable[None]], timeout: float = 120.0):
+        super().__init__(timeout=timeout)
+        self.on_confirm = on_confirm
+        self.confirm.label = label
+
+    @discord.ui.button(label="Confirm", style=discord.ButtonStyle.primary)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(view=None)
+        await self.on_confirm(interaction)
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.stop()
+        await interaction.response.edit_message(content="Cancelled.", view=None)
@@ -1,16 +1,113 @@
 """Data persistence manager for the Variety Friday bot."""
+import asyncio
 import json
 import logging
+import os
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Set, Optional, Dict, Any, List
+from typing import AbstractSet, Set, Optional, Dict, Any, List
+
+from game_catalog import GameCatalog, game_key, match_names
+from voting import as_ballot
 
 logger = logging.getLogger(__name__)
 
+PARTICIPANT_STATUSES = ("yes", "no", "maybe")
+
+# Which version area each non-"set" record bumps; "set" records bump their key
+VERSION_AREAS = {
+    "status": "participants",
+    "clear_participants": "participants",
+    "vote": "votes",
+    "ballot": "votes",
+    "set_votes": "votes",
+    "catalog_add": "game_catalog",
+    "dm_job_add": "dm_outbox",
+    "dm_job_remove": "dm_outbox",
+    "dm_delivered_add": "dm_delivered",
+    "dm_delivered_clear": "dm_delivered",
+}
+
 class DataManager:
     """Handles data persistence for bot state."""
     
-    def __init__(self, data_file: str = "bot_data.json"):
+    def __init__(
+        self,
+        data_file: str = "bot_data.json",
+        write_behind: bool = False,
+        flush_interval: float = 2.0,
+        flush_batch_size: int = 50,
+        journal: bool = False,
+        journal_compact_bytes: int = 64 * 1024,
+        backend=None,
+        max_games: int = 10,
+    ):
         self.data_file = Path(data_file)
+        self.max_games = max_games
+        
+        # Optional storage backend (e.g. sqlite_backend.SQLiteBackend). When
+        # set, it receives every mutation record and the JSON file is only
+        # read once for migration.
+        self.backend = backend
+        self._closed = False
+        
+        # Write-behind state: mutations only bump the dirty counter and the
+        # flusher task coalesces them into a single write.
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._dirty = 0
+        self._batch_depth = 0
+        self._generation = 0
+        self._written_generation = 0
+        self._write_lock = threading.Lock()
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+        
+        # Journal state: every mutation is appended as one record and the
+        # journal is folded into the JSON snapshot once it grows too large.
+        self.journal = journal
+        self.journal_file = self.data_file.with_suffix(".journal")
+        self.journal_compact_bytes = journal_compact_bytes
+        self._old_journal_file = self.journal_file.with_name(self.journal_file.name + ".old")
+        self._journal_fh = None
+        self._compaction: Optional[asyncio.Task] = None
+        self._compacting = False
+        if self.backend is not None:
+            # Moving from journal mode: the journal holds everything since the
+            # last snapshot, so it goes in with it and is only deleted once
+            # the import has committed.
+            if self.backend.import_json(self.data_file, self._read_journal()):
+                self.journal_file.unlink(missing_ok=True)
+                self._old_journal_file.unlink(missing_ok=True)
+        
+        # Participant index: user_id -> status, plus one set per status kept
+        # in sync with it. Lists only exist in the serialized file.
+        self._status: Dict[int, str] = {}
+        self._participants: Dict[str, Set[int]] = {status: set() for status in PARTICIPANT_STATUSES}
+        
+        # Mutation counters per area ("games", "participants", "votes", ...)
+        # so renderers can tell whether cached output is still current.
+        self._versions: Dict[str, int] = {}
+        
+        # Vote tallies: message_id -> {user_id: ballot}, where a ballot is a
+        # bytes ranking of option indexes (one entry for plurality votes),
+        # plus running first-choice counts so a tally never needs a rescan.
+        self._votes: Dict[int, Dict[int, bytes]] = {}
+        self._vote_counts: Dict[int, Dict[int, int]] = {}
+        
+        # Games: normalized key -> name for the current list, and a catalog
+        # of every game ever suggested (kept across /resetgames).
+        self._game_keys: Dict[str, str] = {}
+        self.catalog = GameCatalog()
+        
+        # DM outbox jobs by ID (in queue order) and the dedupe keys already
+        # delivered; both change one item at a time on the reaction hot path.
+        self._dm_outbox: Dict[str, Dict[str, Any]] = {}
+        self._dm_delivered: Set[str] = set()
+        
         self._data = self._load_data()
         
         # Ensure all keys exist
@@ -18,36 +115,351 @@ class DataManager:
         self._data.setdefault("vote_message_id", None)
         self._data.setdefault("last_event_id", None)
         self._data.setdefault("reminder_message_id", None)
-        self._data.setdefault("yes_participants", [])
-        self._data.setdefault("no_participants", [])
-        self._data.setdefault("maybe_participants", [])
+        self._data.setdefault("reminder_channel_id", None)
         self._data.setdefault("tie_message_id", None)
         self._data.setdefault("tie_options", None)
+        self._data.setdefault("vote_channel_id", None)
+        self._data.setdefault("tie_channel_id", None)
+        self._data.setdefault("voting_mode", "reactions")
+        self._data.setdefault("voting_method", "plurality")
+        self._data.setdefault("command_tree_hash", None)
+        self._data.setdefault("schedule_runs", {})
+        self._game_keys = {game_key(g): g for g in self._data["games"]}
+        for game in self._data["games"]:
+            self.catalog.add(game)
         self.save_data()
+        if not self.journal and self.backend is None:
+            # Any journal left over from journal mode is in the snapshot now.
+            self.journal_file.unlink(missing_ok=True)
+            self._old_journal_file.unlink(missing_ok=True)
     
     def _load_data(self) -> Dict[str, Any]:
-        """Load data from JSON file."""
-        if self.data_file.exists():
+        """Load data from JSON file and replay any journal written since."""
+        data = {}
+        if self.backend is not None:
+            data = self.backend.load()
+        elif self.data_file.exists():
             try:
                 with open(self.data_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     logger.info(f"Loaded data from {self.data_file}")
-                    return data
             except Exception as e:
                 logger.error(f"Error loading data from {self.data_file}: {e}")
         
-        # Return default structure
-        return {}
+        for status in PARTICIPANT_STATUSES:
+            for user_id in data.pop(f"{status}_participants", None) or []:
+                self._move_participant(user_id, status)
+        for message_id, votes in (data.pop("votes", None) or {}).items():
+            self._replace_votes(int(message_id), votes)
+        for name in data.pop("game_catalog", None) or []:
+            self.catalog.add(name)
+        for job in data.pop("dm_outbox", None) or []:
+            self._dm_outbox[job["id"]] = job
+        self._dm_delivered.update(data.pop("dm_delivered", None) or [])
+        
+        replayed = 0
+        for op in (self._read_journal() if self.backend is None else ()):
+            self._apply_op(data, op)
+            replayed += 1
+        if replayed:
+            logger.info(f"Replayed {replayed} journal records from {self.journal_file}")
+        return data
+    
+    def _serialize(self) -> str:
+        """Serialize the current state into the JSON file contents."""
+        data = dict(self._data)
+        for status, users in self._participants.items():
+            data[f"{status}_participants"] = list(users)
+        data["game_catalog"] = self.catalog.names()
+        data["dm_outbox"] = list(self._dm_outbox.values())
+        data["dm_delivered"] = list(self._dm_delivered)
+        data["votes"] = {
+            str(message_id): [[user_id, list(ballot)] for user_id, ballot in votes.items()]
+            for message_id, votes in self._votes.items()
+        }
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    
+    def _write_payload(self, generation: int, payload: str) -> bool:
+        """Atomically write a serialized payload (temp file plus rename).
+        
+        Writes older than the last one on disk are dropped, so a slow
+        background write can never overwrite a newer synchronous flush.
+        """
+        with self._write_lock:
+            if generation <= self._written_generation:
+                return True
+            tmp_file = self.data_file.with_name(self.data_file.name + ".tmp")
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.data_file)
+                self._written_generation = generation
+                return True
+            except Exception as e:
+                logger.error(f"Error saving data to {self.data_file}: {e}")
+                return False
     
     def save_data(self) -> bool:
         """Save data to JSON file."""
+        if self.backend is not None:
+            # The backend is updated row by row; just wait for it to catch up.
+            return self.backend.flush()
+        self._generation += 1
+        self._dirty = 0
+        ok = self._write_payload(self._generation, self._serialize())
+        if ok and self.journal:
+            # The snapshot now holds everything the journal did.
+            self._reset_journal()
+        return ok
+    
+    # -------------------------
+    # Mutation log
+    # -------------------------
+    def _set(self, key: str, value: Any, critical: bool = True):
+        """Set a top-level value and persist the change."""
+        op = {"op": "set", "key": key, "value": value}
+        self._apply_op(self._data, op)
+        self._record(op, critical=critical)
+    
+    def _apply_op(self, data: Dict[str, Any], op: Dict[str, Any]):
+        """Apply one mutation record.
+        
+        ``set`` records update ``data``; participant records update the
+        participant index. Records only ever carry absolute values, so
+        replaying one that the snapshot already contains is harmless.
+        """
+        kind = op.get("op")
+        area = op["key"] if kind == "set" else VERSION_AREAS.get(kind)
+        self._versions[area] = self._versions.get(area, 0) + 1
+        if kind == "set":
+            if op["key"] == "dm_outbox":
+                # Whole-list records from before the per-item ones below
+                self._dm_outbox = {job["id"]: job for job in op["value"]}
+            elif op["key"] == "dm_delivered":
+                self._dm_delivered = set(op["value"])
+            else:
+                data[op["key"]] = op["value"]
+            if op["key"] == "games":
+                self._game_keys = {game_key(g): g for g in op["value"]}
+        elif kind == "catalog_add":
+            self.catalog.add(op["name"])
+        elif kind == "dm_job_add":
+            self._dm_outbox[op["job"]["id"]] = op["job"]
+        elif kind == "dm_job_remove":
+            self._dm_outbox.pop(op["id"], None)
+        elif kind == "dm_delivered_add":
+            self._dm_delivered.add(op["key"])
+        elif kind == "dm_delivered_clear":
+            self._dm_delivered.clear()
+        elif kind == "status":
+            self._move_participant(op["user_id"], op["status"])
+        elif kind == "clear_participants":
+            self._status.clear()
+            for users in self._participants.values():
+                users.clear()
+        elif kind == "ballot":
+            self._move_vote(op["message_id"], op["user_id"], as_ballot(op["ballot"]))
+        elif kind == "vote":
+            self._move_vote(op["message_id"], op["user_id"], as_ballot(op["option"]))
+        elif kind == "set_votes":
+            self._replace_votes(op["message_id"], op["votes"])
+        else:
+            logger.warning(f"Ignoring unknown data record: {op}")
+    
+    def _record(self, op: Dict[str, Any], critical: bool = False):
+        """Persist a mutation that has already been applied in memory."""
+        if self.backend is not None:
+            self.backend.apply(op)
+        elif self.journal:
+            self._append_journal(op, critical)
+        else:
+            self._changed(critical)
+    
+    def version(self, *areas: str) -> int:
+        """Mutation counter for the given areas (all areas if none are given)."""
+        if not areas:
+            return sum(self._versions.values())
+        return sum(self._versions.get(area, 0) for area in areas)
+    
+    # -------------------------
+    # Write-behind persistence
+    # -------------------------
+    def _changed(self, critical: bool = False):
+        """Record a mutation.
+        
+        Without write-behind every mutation is saved immediately. With it,
+        mutations are coalesced by the flusher, except critical ones (message
+        and event IDs) which are flushed straight away.
+        """
+        if self._batch_depth:
+            self._dirty += 1
+            return
+        if not self.write_behind or critical:
+            self.save_data()
+            return
+        self._dirty += 1
+        if self._flush_event is not None and self._dirty >= self.flush_batch_size:
+            self._flush_event.set()
+    
+    @contextmanager
+    def batch(self):
+        """Group several mutations into a single save."""
+        self._batch_depth += 1
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self._data, f, indent=2, ensure_ascii=False)
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self.save_data()
+    
+    @property
+    def dirty(self) -> bool:
+        return self._dirty > 0
+    
+    def flush(self) -> bool:
+        """Write pending changes to disk now."""
+        if self._closed:
+            return True  # close() already wrote everything
+        if self._journal_fh is not None:
+            self._journal_fh.flush()
+            os.fsync(self._journal_fh.fileno())
+        if self.backend is not None:
+            return self.backend.flush()
+        if not self._dirty:
             return True
+        return self.save_data()
+    
+    def start_flusher(self):
+        """Start the background flusher on the running event loop."""
+        if not self.write_behind or self.journal or self.backend is not None or self._flusher is not None:
+            return
+        self._flush_event = asyncio.Event()
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+    
+    async def _flush_loop(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            if not self._dirty:
+                continue
+            
+            # Serialize on the loop so the snapshot is consistent, write off it.
+            self._generation += 1
+            pending, self._dirty = self._dirty, 0
+            try:
+                ok = await asyncio.to_thread(self._write_payload, self._generation, self._serialize())
+            except BaseException:
+                self._dirty += pending
+                raise
+            if not ok:
+                self._dirty += pending
+    
+    async def close(self):
+        """Stop the flusher, let an in-flight write finish and write everything once more."""
+        if self._flusher is not None:
+            # Not cancelled: a cancel would abandon a write already in progress
+            self._stopping = True
+            self._flush_event.set()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self._compaction is not None:
+            await self._compaction
+        if self.backend is not None:
+            await asyncio.to_thread(self.backend.close)
+        else:
+            if self._journal_fh is not None:
+                self._journal_fh.flush()
+                os.fsync(self._journal_fh.fileno())
+            self.save_data()
+        self._closed = True
+    
+    # -------------------------
+    # Journal persistence
+    # -------------------------
+    def _read_journal(self):
+        """Yield journal records, oldest first.
+        
+        A torn last line (crash mid-append) ends that file's replay.
+        """
+        for path in (self._old_journal_file, self.journal_file):
+            if not path.exists():
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Stopping replay of {path} at torn record on line {line_no}")
+                        break
+    
+    def _reset_journal(self):
+        """Truncate the journal after a full snapshot was written."""
+        if self._journal_fh is not None:
+            self._journal_fh.close()
+        self._journal_fh = open(self.journal_file, 'w', encoding='utf-8')
+        self._old_journal_file.unlink(missing_ok=True)
+    
+    def _append_journal(self, op: Dict[str, Any], critical: bool = False):
+        line = json.dumps(op, ensure_ascii=False, separators=(',', ':')) + "\n"
+        try:
+            self._journal_fh.write(line)
+            self._journal_fh.flush()
+            if critical:
+                os.fsync(self._journal_fh.fileno())
         except Exception as e:
-            logger.error(f"Error saving data to {self.data_file}: {e}")
-            return False
+            logger.error(f"Error appending to {self.journal_file}: {e}")
+            return
+        if not self._compacting and self._journal_fh.tell() >= self.journal_compact_bytes:
+            self._compact_journal()
+    
+    def _compact_journal(self):
+        """Fold the journal into a fresh snapshot.
+        
+        The live journal is rotated aside and a new one started, so mutations
+        keep appending while the snapshot is written in the background. The
+        rotated journal is only deleted once the snapshot is on disk.
+        """
+        self._compacting = True
+        self._journal_fh.close()
+        if self._old_journal_file.exists():
+            # A previous compaction failed; keep its records in order.
+            with open(self._old_journal_file, 'a', encoding='utf-8') as dst, \
+                    open(self.journal_file, 'r', encoding='utf-8') as src:
+                dst.write(src.read())
+            os.remove(self.journal_file)
+        else:
+            os.replace(self.journal_file, self._old_journal_file)
+        self._journal_fh = open(self.journal_file, 'a', encoding='utf-8')
+        
+        self._generation += 1
+        args = (self._generation, self._serialize())
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._finish_compaction(*args)
+            return
+        self._compaction = loop.create_task(self._compact_in_background(*args))
+    
+    async def _compact_in_background(self, generation: int, payload: str):
+        try:
+            await asyncio.to_thread(self._finish_compaction, generation, payload)
+        finally:
+            self._compaction = None
+    
+    def _finish_compaction(self, generation: int, payload: str) -> bool:
+        ok = self._write_payload(generation, payload)
+        if ok:
+            self._old_journal_file.unlink(missing_ok=True)
+            logger.info(f"Compacted {self.journal_file} into {self.data_file}")
+        self._compacting = False
+        return ok
     
     # -------------------------
     # Games management
@@ -56,26 +468,43 @@ class DataManager:
     def games(self) -> List[str]:
         return self._data.get("games", [])
     
+    @property
+    def game_keys(self) -> AbstractSet[str]:
+        """Normalized keys of the current games."""
+        return self._game_keys.keys()
+    
+    def suggest_games(self, query: str, limit: int = 25) -> List[str]:
+        """Current games matching ``query``; scans the (small) game list, not the catalog."""
+        return match_names(self._game_keys, query, limit)
+    
+    def has_game(self, game_name: str) -> bool:
+        return game_key(game_name) in self._game_keys
+    
     def addgame(self, game_name: str) -> bool:
-        if len(self.games) >= 10:
+        if len(self.games) >= self.max_games:
             return False
-        if game_name.lower() not in [g.lower() for g in self.games]:
-            self._data["games"].append(game_name)
-            self.save_data()
+        if not self.has_game(game_name):
+            self._set("games", self.games + [game_name], critical=False)
+            self.add_to_catalog(game_name)
             return True
         return False
     
     def removegame(self, game_name: str) -> bool:
-        for game in self.games:
-            if game.lower() == game_name.lower():
-                self._data["games"].remove(game)
-                self.save_data()
-                return True
-        return False
+        game = self._game_keys.get(game_key(game_name))
+        if game is None:
+            return False
+        self._set("games", [g for g in self.games if g is not game], critical=False)
+        return True
+    
+    def add_to_catalog(self, game_name: str):
+        if game_name in self.catalog:
+            return
+        op = {"op": "catalog_add", "name": game_name}
+        self._apply_op(self._data, op)
+        self._record(op)
     
     def resetgames(self):
-        self._data["games"] = []
-        self.save_data()
+        self._set("games", [], critical=False)
     
     # -------------------------
     # Message IDs
@@ -86,8 +515,7 @@ class DataManager:
     
     @vote_message_id.setter
     def vote_message_id(self, value: Optional[int]):
-        self._data["vote_message_id"] = value
-        self.save_data()
+        self._set("vote_message_id", value)
     
     @property
     def last_event_id(self) -> Optional[int]:
@@ -95,8 +523,7 @@ class DataManager:
     
     @last_event_id.setter
     def last_event_id(self, value: Optional[int]):
-        self._data["last_event_id"] = value
-        self.save_data()
+        self._set("last_event_id", value)
     
     @property
     def reminder_message_id(self) -> Optional[int]:
@@ -104,8 +531,15 @@ class DataManager:
     
     @reminder_message_id.setter
     def reminder_message_id(self, value: Optional[int]):
-        self._data["reminder_message_id"] = value
-        self.save_data()
+        self._set("reminder_message_id", value)
+    
+    @property
+    def reminder_channel_id(self) -> Optional[int]:
+        return self._data.get("reminder_channel_id")
+    
+    @reminder_channel_id.setter
+    def reminder_channel_id(self, value: Optional[int]):
+        self._set("reminder_channel_id", value)
     
     # -------------------------
     # Tie-breaking
@@ -116,8 +550,7 @@ class DataManager:
     
     @tie_message_id.setter
     def tie_message_id(self, value: Optional[int]):
-        self._data["tie_message_id"] = value
-        self.save_data()
+        self._set("tie_message_id", value)
     
     @property
     def tie_options(self) -> Optional[List[str]]:
@@ -125,86 +558,248 @@ class DataManager:
     
     @tie_options.setter
     def tie_options(self, value: Optional[List[str]]):
-        self._data["tie_options"] = value
-        self.save_data()
+        self._set("tie_options", value)
     
     # -------------------------
     # Participants management
     # -------------------------
+    # The participant sets are the live index; callers must not mutate them
+    # and should copy them before iterating across an await.
     @property
     def yes_participants(self) -> Set[int]:
-        return set(self._data.get("yes_participants", []))
+        return self._participants["yes"]
     
     @property
     def no_participants(self) -> Set[int]:
-        return set(self._data.get("no_participants", []))
+        return self._participants["no"]
     
     @property
     def maybe_participants(self) -> Set[int]:
-        return set(self._data.get("maybe_participants", []))
+        return self._participants["maybe"]
+    
+    def participant_status(self, user_id: int) -> Optional[str]:
+        """Return "yes", "no", "maybe" or None for a user."""
+        return self._status.get(user_id)
+    
+    def _move_participant(self, user_id: int, status: Optional[str]):
+        """Update the participant index in place."""
+        previous = self._status.pop(user_id, None)
+        if previous is not None:
+            self._participants[previous].discard(user_id)
+        if status is not None:
+            self._status[user_id] = status
+            self._participants[status].add(user_id)
+    
+    def set_participant_status(self, user_id: int, status: Optional[str]):
+        """Move a user to one status (or out of all of them)."""
+        if self._status.get(user_id) == status:
+            return
+        op = {"op": "status", "user_id": user_id, "status": status}
+        self._apply_op(self._data, op)
+        self._record(op)
     
     def add_yes_participant(self, user_id: int):
-        yes_set = set(self._data.get("yes_participants", []))
-        no_set = set(self._data.get("no_participants", []))
-        maybe_set = set(self._data.get("maybe_participants", []))
-        
-        yes_set.add(user_id)
-        no_set.discard(user_id)
-        maybe_set.discard(user_id)
-        
-        self._data["yes_participants"] = list(yes_set)
-        self._data["no_participants"] = list(no_set)
-        self._data["maybe_participants"] = list(maybe_set)
-        self.save_data()
+        self.set_participant_status(user_id, "yes")
     
     def add_no_participant(self, user_id: int):
-        no_set = set(self._data.get("no_participants", []))
-        yes_set = set(self._data.get("yes_participants", []))
-        maybe_set = set(self._data.get("maybe_participants", []))
-        
-        no_set.add(user_id)
-        yes_set.discard(user_id)
-        maybe_set.discard(user_id)
-        
-        self._data["yes_participants"] = list(yes_set)
-        self._data["no_participants"] = list(no_set)
-        self._data["maybe_participants"] = list(maybe_set)
-        self.save_data()
+        self.set_participant_status(user_id, "no")
     
     def add_maybe_participant(self, user_id: int):
-        maybe_set = set(self._data.get("maybe_participants", []))
-        yes_set = set(self._data.get("yes_participants", []))
-        no_set = set(self._data.get("no_participants", []))
-        
-        maybe_set.add(user_id)
-        yes_set.discard(user_id)
-        no_set.discard(user_id)
-        
-        self._data["yes_participants"] = list(yes_set)
-        self._data["no_participants"] = list(no_set)
-        self._data["maybe_participants"] = list(maybe_set)
-        self.save_data()
+        self.set_participant_status(user_id, "maybe")
     
     def remove_yes_participant(self, user_id: int):
-        yes_set = set(self._data.get("yes_participants", []))
-        yes_set.discard(user_id)
-        self._data["yes_participants"] = list(yes_set)
-        self.save_data()
+        if self._status.get(user_id) == "yes":
+            self.set_participant_status(user_id, None)
     
     def remove_no_participant(self, user_id: int):
-        no_set = set(self._data.get("no_participants", []))
-        no_set.discard(user_id)
-        self._data["no_participants"] = list(no_set)
-        self.save_data()
+        if self._status.get(user_id) == "no":
+            self.set_participant_status(user_id, None)
     
     def remove_maybe_participant(self, user_id: int):
-        maybe_set = set(self._data.get("maybe_participants", []))
-        maybe_set.discard(user_id)
-        self._data["maybe_participants"] = list(maybe_set)
-        self.save_data()
+        if self._status.get(user_id) == "maybe":
+            self.set_participant_status(user_id, None)
     
     def clear_participants(self):
-        self._data["yes_participants"] = []
-        self._data["no_participants"] = []
-        self._data["maybe_participants"] = []
-        self.save_data()
+        op = {"op": "clear_participants"}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    # -------------------------
+    # Vote tallies
+    # -------------------------
+    @property
+    def vote_channel_id(self) -> Optional[int]:
+        return self._data.get("vote_channel_id")
+    
+    @vote_channel_id.setter
+    def vote_channel_id(self, value: Optional[int]):
+        self._set("vote_channel_id", value)
+    
+    @property
+    def tie_channel_id(self) -> Optional[int]:
+        return self._data.get("tie_channel_id")
+    
+    @tie_channel_id.setter
+    def tie_channel_id(self, value: Optional[int]):
+        self._set("tie_channel_id", value)
+    
+    @property
+    def voting_mode(self) -> str:
+        """How the current vote is cast: "reactions" or "components"."""
+        return self._data.get("voting_mode", "reactions")
+    
+    @voting_mode.setter
+    def voting_mode(self, value: str):
+        self._set("voting_mode", value)
+    
+    @property
+    def voting_method(self) -> str:
+        """How the current vote is counted: "plurality", "approval" or "irv"."""
+        return self._data.get("voting_method", "plurality")
+    
+    @voting_method.setter
+    def voting_method(self, value: str):
+        self._set("voting_method", value)
+    
+    def vote_of(self, message_id: int, user_id: int) -> Optional[int]:
+        """Return a user's first choice on a message."""
+        ballot = self._votes.get(message_id, {}).get(user_id)
+        return ballot[0] if ballot else None
+    
+    def ballot(self, message_id: int, user_id: int) -> bytes:
+        """Return a user's ranked ballot on a message (empty if none)."""
+        return self._votes.get(message_id, {}).get(user_id, b"")
+    
+    def votes(self, message_id: int) -> Dict[int, bytes]:
+        """Return the live user_id -> ballot map for a message (read-only)."""
+        return self._votes.get(message_id, {})
+    
+    def vote_counts(self, message_id: int, num_options: int) -> List[int]:
+        """Return per-option first-choice counts, one vote per user."""
+        counts = self._vote_counts.get(message_id, {})
+        return [counts.get(option, 0) for option in range(num_options)]
+    
+    def _move_vote(self, message_id: int, user_id: int, ballot: bytes):
+        votes = self._votes.setdefault(message_id, {})
+        counts = self._vote_counts.setdefault(message_id, {})
+        previous = votes.pop(user_id, None)
+        if previous:
+            counts[previous[0]] -= 1
+        if ballot:
+            votes[user_id] = ballot
+            counts[ballot[0]] = counts.get(ballot[0], 0) + 1
+    
+    def _replace_votes(self, message_id: int, votes: List[List[Any]]):
+        self._votes.pop(message_id, None)
+        self._vote_counts.pop(message_id, None)
+        for user_id, ballot in votes:
+            self._move_vote(message_id, user_id, as_ballot(ballot))
+        if not votes:
+            self._votes.pop(message_id, None)
+            self._vote_counts.pop(message_id, None)
+    
+    def _set_ballot(self, message_id: int, user_id: int, ballot: bytes):
+        if self.ballot(message_id, user_id) == ballot:
+            return
+        op = {"op": "ballot", "message_id": message_id, "user_id": user_id, "ballot": list(ballot)}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    def record_vote(self, message_id: int, user_id: int, option: int, ranked: bool = False):
+        """Count a user's vote for an option.
+        
+        By default the vote replaces any earlier choice on that message; with
+        ``ranked`` the option is appended to the user's ballot instead.
+        """
+        if not ranked:
+            self._set_ballot(message_id, user_id, bytes([option]))
+            return
+        ballot = self.ballot(message_id, user_id)
+        if option not in ballot:
+            self._set_ballot(message_id, user_id, ballot + bytes([option]))
+    
+    def add_choice(self, message_id: int, user_id: int, option: int):
+        """Add an option to a user's set of choices, kept in option order.
+        
+        Used for reaction plurality votes, where one user may react to several
+        options; how that set counts is decided when the vote is counted.
+        """
+        ballot = self.ballot(message_id, user_id)
+        if option not in ballot:
+            self._set_ballot(message_id, user_id, bytes(sorted(ballot + bytes([option]))))
+    
+    def remove_vote(self, message_id: int, user_id: int, option: int):
+        """Take an option off a user's ballot, if it is on it."""
+        ballot = self.ballot(message_id, user_id)
+        if option in ballot:
+            self._set_ballot(message_id, user_id, ballot.replace(bytes([option]), b""))
+    
+    def replace_votes(self, message_id: int, votes: Dict[int, bytes]):
+        """Replace a message's whole tally, e.g. after reconciling with Discord."""
+        op = {"op": "set_votes", "message_id": message_id, "votes": [[u, list(b)] for u, b in votes.items() if b]}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    def clear_votes(self, message_id: int):
+        if message_id not in self._votes:
+            return
+        self.replace_votes(message_id, {})
+    
+    # -------------------------
+    # DM outbox
+    # -------------------------
+    @property
+    def dm_outbox(self) -> List[Dict[str, Any]]:
+        return list(self._dm_outbox.values())
+    
+    def add_dm_job(self, job: Dict[str, Any]):
+        op = {"op": "dm_job_add", "job": job}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    def remove_dm_job(self, job_id: str):
+        if job_id not in self._dm_outbox:
+            return
+        op = {"op": "dm_job_remove", "id": job_id}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    def dm_delivered(self, key: str) -> bool:
+        return key in self._dm_delivered
+    
+    def mark_dm_delivered(self, key: str):
+        if key in self._dm_delivered:
+            return
+        op = {"op": "dm_delivered_add", "key": key}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    def clear_dm_delivered(self):
+        if not self._dm_delivered:
+            return
+        op = {"op": "dm_delivered_clear"}
+        self._apply_op(self._data, op)
+        self._record(op)
+    
+    # -------------------------
+    # Command sync
+    # -------------------------
+    @property
+    def command_tree_hash(self) -> Optional[str]:
+        """Hash of the command tree as last synced to Discord."""
+        return self._data.get("command_tree_hash")
+    
+    @command_tree_hash.setter
+    def command_tree_hash(self, value: Optional[str]):
+        self._set("command_tree_hash", value)
+    
+    # -------------------------
+    # Scheduler
+    # -------------------------
+    @property
+    def schedule_runs(self) -> Dict[str, str]:
+        """Start time (ISO) of the event occurrence each scheduled stage last ran for."""
+        return self._data.get("schedule_runs", {})
+    
+    def mark_scheduled_run(self, stage: str, occurrence: str):
+        self._set("schedule_runs", {**self.schedule_runs, stage: occurrence})
@@ -0,0 +1,67 @@
+"""Concurrent DM fan-out for the Variety Friday bot."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+import discord
+
+from utils import safe_send_dm, with_retries
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DeliveryReport:
+    """Per-user outcome of a DM fan-out."""
+    sent: List[int] = field(default_factory=list)
+    failed: Dict[int, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        return f"{len(self.sent)} sent, {len(self.failed)} failed in {self.elapsed:.1f}s"
+
+class DMDispatcher:
+    """Sends one message to many users with bounded concurrency.
+
+    Users are resolved from the member/user cache before falling back to an
+    API fetch. discord.py already queues requests per rate-limit bucket; the
+    semaphore keeps us from piling hundreds of requests into those queues at
+    once, and 429/5xx errors that still surface are retried with backoff.
+    """
+
+    def __init__(self, bot: discord.Client, concurrency: int = 5, retries: int = 3, backoff: float = 1.0):
+        self.bot = bot
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def resolve(self, user_id: int, guild: Optional[discord.Guild] = None) -> Optional[discord.abc.User]:
+        """Find a user, preferring the caches over an HTTP fetch."""
+        user = (guild.get_member(user_id) if guild else None) or self.bot.get_user(user_id)
+        if user is not None:
+            return user
+        try:
+            return await with_retries(lambda: self.bot.fetch_user(user_id), self.retries, self.backoff)
+        except discord.HTTPException:
+            return None  # Unknown user, or still failing after the retries
+
+    async def _deliver(self, user_id: int, message: str, guild: Optional[discord.Guild], report: DeliveryReport):
+        async with self._semaphore:
+            user = await self.resolve(user_id, guild)
+            if user is None:
+                report.failed[user_id] = "user not found"
+                return
+            if await safe_send_dm(user, message, retries=self.retries, backoff=self.backoff):
+                report.sent.append(user_id)
+            else:
+                report.failed[user_id] = "DM not delivered"
+
+    async def send_all(self, user_ids: Iterable[int], message: str, guild: Optional[discord.Guild] = None) -> DeliveryReport:
+        """DM every user and report who got it."""
+        report = DeliveryReport()
+        started = time.perf_counter()
+        await asyncio.gather(*(self._deliver(uid, message, guild, report) for uid in list(user_ids)))
+        report.elapsed = time.perf_counter() - started
+        logger.info(f"DM fan-out finished: {report.summary()}")
+        return report
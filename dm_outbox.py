@@ -0,0 +1,140 @@
+"""Persistent background outbox for DMs sent from event handlers."""
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import discord
+
+from data_manager import DataManager
+from dm_dispatcher import DMDispatcher
+from utils import with_retries
+
+logger = logging.getLogger(__name__)
+
+class DMOutbox:
+    """Durable DM queue drained by a small worker pool.
+
+    ``enqueue`` only records the job through DataManager and hands it to the
+    workers, so handlers return immediately. Jobs still pending at shutdown
+    are picked up again on the next start. A job with a dedupe key is sent at
+    most once per key until ``DataManager.clear_dm_delivered`` is called.
+    """
+
+    def __init__(
+        self,
+        data: DataManager,
+        dispatcher: DMDispatcher,
+        guild_id: Optional[int] = None,
+        workers: int = 2,
+        per_second: float = 5.0,
+        max_attempts: int = 5,
+    ):
+        self.data = data
+        self.dispatcher = dispatcher
+        self.guild_id = guild_id
+        self.workers = workers
+        self.min_interval = 1.0 / per_second
+        self.max_attempts = max_attempts
+        self.stats: Dict[str, int] = {
+            "enqueued": 0, "sent": 0, "failed": 0, "retried": 0, "deduplicated": 0,
+        }
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pending_keys = set()
+        self._rate_lock = asyncio.Lock()
+        self._last_send = 0.0
+
+    def enqueue(self, user_id: int, message: str, dedupe_key: Optional[str] = None) -> bool:
+        """Queue a DM. Returns False if it was dropped as a duplicate."""
+        if dedupe_key is not None and (dedupe_key in self._pending_keys or self.data.dm_delivered(dedupe_key)):
+            self.stats["deduplicated"] += 1
+            return False
+        job = {"id": uuid.uuid4().hex, "user_id": user_id, "message": message, "key": dedupe_key}
+        self.data.add_dm_job(job)
+        self._track(job)
+        self.stats["enqueued"] += 1
+        return True
+
+    def _track(self, job: Dict[str, Any]):
+        if job.get("key") is not None:
+            self._pending_keys.add(job["key"])
+        if self._queue is not None:
+            self._queue.put_nowait(job)
+
+    def start(self):
+        """Start the workers and resume jobs persisted by a previous run."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        for job in self.data.dm_outbox:
+            self._track(job)
+        if self.data.dm_outbox:
+            logger.info(f"Resuming {len(self.data.dm_outbox)} queued DMs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else len(self.data.dm_outbox)
+
+    async def _throttle(self):
+        """Space sends at least ``min_interval`` apart across all workers."""
+        async with self._rate_lock:
+            wait = self._last_send + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_send = time.monotonic()
+
+    def _finish(self, job: Dict[str, Any], delivered: bool):
+        self.data.remove_dm_job(job["id"])
+        if job.get("key") is not None:
+            self._pending_keys.discard(job["key"])
+            if delivered:
+                self.data.mark_dm_delivered(job["key"])
+        self.stats["sent" if delivered else "failed"] += 1
+
+    def _count_retry(self, error: discord.HTTPException, delay: float):
+        self.stats["retried"] += 1
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except Exception as e:
+                logger.error(f"DM outbox job {job['id']} crashed: {e}")
+                self._finish(job, delivered=False)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: Dict[str, Any]):
+        guild = self.dispatcher.bot.get_guild(self.guild_id) if self.guild_id else None
+        user = await self.dispatcher.resolve(job["user_id"], guild)
+        if user is None:
+            logger.warning(f"Dropping DM to unknown user {job['user_id']}")
+            self._finish(job, delivered=False)
+            return
+
+        await self._throttle()
+        try:
+            await with_retries(
+                lambda: user.send(job["message"]),
+                self.max_attempts - 1,
+                self.dispatcher.backoff,
+                on_retry=self._count_retry,
+            )
+        except discord.Forbidden:
+            logger.warning(f"Could not send DM to {user.display_name}: DMs closed")
+            self._finish(job, delivered=False)
+        except discord.HTTPException as e:
+            logger.warning(f"Giving up on DM to {user.display_name}: {e}")
+            self._finish(job, delivered=False)
+        else:
+            self._finish(job, delivered=True)
@@ -0,0 +1,83 @@
+"""Coalesced, rate-limited in-place embed refreshes for the Variety Friday bot."""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+class EmbedUpdater:
+    """Keeps tracked messages' embeds in sync with in-memory state.
+
+    ``notify`` is cheap and can be called on every change; each message is
+    edited at most once every ``min_interval`` seconds, always with the
+    latest state from ``render``. However many changes arrive in between,
+    they cost one ``message.edit``.
+    """
+
+    def __init__(
+        self,
+        client: discord.Client,
+        render: Callable[[int], Optional[discord.Embed]],
+        min_interval: float = 5.0,
+    ):
+        self.client = client
+        self.render = render
+        self.min_interval = min_interval
+        self._channels: Dict[int, int] = {}          # message_id -> channel_id
+        self._last_edit: Dict[int, float] = {}
+        self._pending: Dict[int, asyncio.Task] = {}
+        self._started = time.monotonic()
+        self.metrics: Dict[str, int] = {"notified": 0, "edits": 0, "coalesced": 0, "failed": 0}
+
+    def track(self, channel_id: int, message_id: int):
+        self._channels[message_id] = channel_id
+
+    def untrack(self, message_id: int):
+        self._channels.pop(message_id, None)
+        self._last_edit.pop(message_id, None)
+        task = self._pending.pop(message_id, None)
+        if task is not None:
+            task.cancel()
+
+    def notify(self, message_id: int):
+        """Note that a tracked message's state changed."""
+        if message_id not in self._channels:
+            return
+        self.metrics["notified"] += 1
+        if message_id in self._pending:
+            self.metrics["coalesced"] += 1  # Folded into the edit already scheduled
+            return
+        self._pending[message_id] = asyncio.create_task(self._refresh(message_id))
+
+    @property
+    def edits_per_minute(self) -> float:
+        elapsed = max(time.monotonic() - self._started, 1.0)
+        return self.metrics["edits"] * 60 / elapsed
+
+    async def _refresh(self, message_id: int):
+        try:
+            wait = self._last_edit.get(message_id, 0.0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            # Changes from here on need another edit, so let them schedule one
+            self._pending.pop(message_id, None)
+            channel = self.client.get_channel(self._channels.get(message_id, 0))
+            embed = self.render(message_id)
+            if channel is None or embed is None:
+                return
+            self._last_edit[message_id] = time.monotonic()
+            await channel.get_partial_message(message_id).edit(embed=embed)
+            self.metrics["edits"] += 1
+        except asyncio.CancelledError:
+            raise
+        except discord.NotFound:
+            self.untrack(message_id)
+        except Exception as e:
+            self.metrics["failed"] += 1
+            logger.warning(f"Could not refresh embed on message {message_id}: {e}")
+        finally:
+            if self._pending.get(message_id) is asyncio.current_task():
+                del self._pending[message_id]
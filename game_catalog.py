@@ -0,0 +1,167 @@
+"""Indexed catalog of every game ever suggested for Variety Friday."""
+import re
+from bisect import bisect_left, insort
+from typing import AbstractSet, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set
+
+def game_key(name: str) -> str:
+    """Normalized name used for duplicate checks and lookups."""
+    return " ".join(name.casefold().split())
+
+_NUMBERS = re.compile(r'\b\d+\b')
+
+def _numbers(name: str) -> List[str]:
+    """Numbers that stand as their own word, e.g. the 7 in "Pack 7" but not the 5 in "u5"."""
+    return _NUMBERS.findall(game_key(name))
+
+def _trigrams(key: str) -> Set[str]:
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+def match_names(names_by_key: Mapping[str, str], query: str, limit: int = 25) -> List[str]:
+    """``GameCatalog.suggest`` ordering over a small key -> name map, scanned directly."""
+    q = game_key(query)
+    prefix = sorted(key for key in names_by_key if key.startswith(q))
+    substring = sorted(key for key in names_by_key if q in key and not key.startswith(q))
+    return [names_by_key[key] for key in (prefix + substring)[:limit]]
+
+class NearDuplicate(NamedTuple):
+    name: str
+    score: float   # trigram Jaccard similarity, 1.0 for identical normalized names
+
+class NearDuplicateIndex:
+    """Trigram Jaccard similarity over normalized game names.
+
+    ``normalize`` should fold away punctuation, spacing and leetspeak so that
+    "Among Us", "among-us" and "Amongus" all collapse to the same string.
+    Candidates come from a trigram posting index, so a lookup only scores
+    names that share at least one trigram with the query. Names whose
+    standalone numbers differ ("Jackbox Party Pack 7" vs "8", "Among Us 2")
+    are never flagged; the numbers come from the unfolded name, so leet
+    digits inside words ("4m0ng u5") only feed the similarity score.
+    """
+
+    def __init__(self, normalize: Callable[[str], str], threshold: float = 0.6):
+        self.normalize = normalize
+        self.threshold = threshold
+        self._names: Dict[str, str] = {}
+        self._gram_counts: Dict[str, int] = {}
+        self._grams: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def _padded_trigrams(norm: str) -> Set[str]:
+        # Padding lets short names and word edges produce trigrams too
+        return _trigrams(f"^{norm}$")
+
+    def add(self, name: str):
+        norm = self.normalize(name)
+        if not norm or norm in self._names:
+            return
+        self._names[norm] = name
+        grams = self._padded_trigrams(norm)
+        self._gram_counts[norm] = len(grams)
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(norm)
+
+    def find(self, name: str, within: Optional[AbstractSet[str]] = None) -> Optional[NearDuplicate]:
+        """Best match at or above the threshold, optionally limited to game keys in ``within``."""
+        norm = self.normalize(name)
+        if not norm:
+            return None
+        grams = self._padded_trigrams(norm)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+
+        numbers = _numbers(name)
+        best: Optional[NearDuplicate] = None
+        for candidate, common in shared.items():
+            score = common / (len(grams) + self._gram_counts[candidate] - common)
+            if score < self.threshold or (best is not None and score <= best.score):
+                continue
+            other = self._names[candidate]
+            if within is not None and game_key(other) not in within:
+                continue
+            if _numbers(other) != numbers:
+                continue
+            best = NearDuplicate(other, score)
+        return best
+
+class GameCatalog:
+    """Game names indexed for O(1) lookups and fast autocomplete.
+
+    Keeps a key -> name dict, a sorted key list for prefix searches and a
+    trigram index for substring searches, all updated on insert.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: Dict[str, str] = {}
+        self._sorted_keys: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._fuzzy: Optional[NearDuplicateIndex] = None
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return game_key(name) in self._names
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the catalog spelling of a name, if present."""
+        return self._names.get(game_key(name))
+
+    def names(self) -> List[str]:
+        return list(self._names.values())
+
+    def add(self, name: str) -> bool:
+        """Add a name; returns False if it was already catalogued."""
+        key = game_key(name)
+        if not key or key in self._names:
+            return False
+        self._names[key] = name
+        insort(self._sorted_keys, key)
+        for gram in _trigrams(key):
+            self._trigrams.setdefault(gram, set()).add(key)
+        if self._fuzzy is not None:
+            self._fuzzy.add(name)
+        return True
+
+    def enable_fuzzy(self, normalize: Callable[[str], str], threshold: float = 0.6):
+        """Build a near-duplicate index over the catalog using ``normalize``."""
+        self._fuzzy = NearDuplicateIndex(normalize, threshold)
+        for name in self._names.values():
+            self._fuzzy.add(name)
+
+    def near_duplicate(self, name: str, within: Optional[AbstractSet[str]] = None) -> Optional[NearDuplicate]:
+        """Closest catalogued name to ``name``, if fuzzy matching is enabled."""
+        if self._fuzzy is None:
+            return None
+        return self._fuzzy.find(name, within)
+
+    def suggest(self, query: str, limit: int = 25) -> List[str]:
+        """Names matching ``query``: prefix matches first, then substring matches."""
+        q = game_key(query)
+        results: List[str] = []
+        seen: Set[str] = set()
+
+        def take(key: str) -> bool:
+            if key not in seen:
+                seen.add(key)
+                results.append(self._names[key])
+            return len(results) >= limit
+
+        i = bisect_left(self._sorted_keys, q)
+        while i < len(self._sorted_keys) and self._sorted_keys[i].startswith(q):
+            if take(self._sorted_keys[i]):
+                return results
+            i += 1
+
+        if len(q) >= 3:
+            # Intersect the rarest trigrams first to keep the candidate set small
+            postings = sorted((self._trigrams.get(g, set()) for g in _trigrams(q)), key=len)
+            candidates = set.intersection(*postings) if postings else set()
+            for key in sorted(candidates):
+                if q in key and take(key):
+                    break
+        return results
@@ -0,0 +1,133 @@
+"""Health check and Prometheus metrics endpoint served on the bot's event loop."""
+import logging
+import math
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import discord
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+class Metric(NamedTuple):
+    """One Prometheus sample."""
+    name: str
+    value: float
+    kind: str = "gauge"     # "gauge", "counter" or "histogram" (for the TYPE line)
+    help: str = ""
+    labels: Optional[Dict[str, str]] = None
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render_metrics(metrics: Iterable[Metric]) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    described = set()
+    for metric in metrics:
+        family = metric.name
+        if metric.kind == "histogram":
+            family = metric.name.rsplit("_", 1)[0]  # name_bucket/_sum/_count share one family
+        if family not in described:
+            described.add(family)
+            if metric.help:
+                lines.append(f"# HELP {family} {metric.help}")
+            lines.append(f"# TYPE {family} {metric.kind}")
+        labels = ""
+        if metric.labels:
+            labels = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in metric.labels.items()) + "}"
+        lines.append(f"{metric.name}{labels} {_format_value(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+class HealthServer:
+    """aiohttp server for ``/healthz`` and ``/metrics``.
+
+    Runs as part of the bot's own event loop (no extra thread) and is
+    started from ``setup_hook`` and stopped from ``Bot.close``. Other
+    components expose metrics by registering a collector that returns
+    ``Metric`` samples.
+    """
+
+    def __init__(self, bot: discord.Client, host: str = "0.0.0.0", port: int = 8080, max_latency: float = 10.0):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.max_latency = max_latency
+        self.started = time.monotonic()
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+        self._runner: Optional[web.AppRunner] = None
+        self.app = web.Application()
+        self.app.router.add_get("/", self.home)
+        self.app.router.add_get("/healthz", self.healthz)
+        self.app.router.add_get("/metrics", self.metrics)
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]):
+        self._collectors.append(collector)
+
+    def add_route(self, method: str, path: str, handler):
+        """Register an extra endpoint; must be called before ``start``."""
+        self.app.router.add_route(method, path, handler)
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Health server listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner = None
+        logger.info("Health server stopped")
+
+    # -------------------------
+    # Handlers
+    # -------------------------
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="Variety Friday Bot is online!")
+
+    def health(self) -> Dict[str, object]:
+        latency = self.bot.latency
+        ready = self.bot.is_ready() and not self.bot.is_closed()
+        healthy = ready and math.isfinite(latency) and latency <= self.max_latency
+        return {
+            "status": "ok" if healthy else "unavailable",
+            "ready": ready,
+            "latency_ms": round(latency * 1000, 1) if math.isfinite(latency) else None,
+            "guilds": len(self.bot.guilds),
+            "uptime_s": round(time.monotonic() - self.started, 1),
+        }
+
+    async def healthz(self, request: web.Request) -> web.Response:
+        health = self.health()
+        return web.json_response(health, status=200 if health["status"] == "ok" else 503)
+
+    def collect(self) -> List[Metric]:
+        latency = self.bot.latency
+        samples = [
+            Metric("bot_up", 1.0 if self.bot.is_ready() and not self.bot.is_closed() else 0.0,
+                   help="1 while the gateway connection is ready"),
+            Metric("bot_gateway_latency_seconds", latency if math.isfinite(latency) else -1.0,
+                   help="Last heartbeat round trip (-1 before the first heartbeat)"),
+            Metric("bot_guilds", len(self.bot.guilds), help="Guilds the bot is in"),
+            Metric("bot_uptime_seconds", time.monotonic() - self.started, help="Seconds since the bot started"),
+        ]
+        for collector in self._collectors:
+            try:
+                samples.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector {collector} failed: {e}")
+        return samples
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=render_metrics(self.collect()), content_type="text/plain", charset="utf-8")
@@ -0,0 +1,238 @@
+"""Latency histograms for slash commands, gateway handlers and Discord HTTP calls."""
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from health_server import Metric
+
+logger = logging.getLogger(__name__)
+
+# Seconds; roughly log-spaced from "instant" to "missed the interaction window"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+INTERACTION_DEADLINE = 3.0  # Discord drops interactions not answered within this
+
+class Histogram:
+    """Fixed-bucket latency histogram: one bisect and two adds per sample."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample (inf past the last bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+class OperationStats:
+    """Wall time split into time spent waiting on Discord HTTP and everything else."""
+
+    __slots__ = ("wall", "http_seconds", "http_calls", "errors", "missed_deadline")
+
+    def __init__(self):
+        self.wall = Histogram()
+        self.http_seconds = 0.0
+        self.http_calls = 0
+        self.errors = 0
+        self.missed_deadline = 0
+
+    @property
+    def local_seconds(self) -> float:
+        return max(self.wall.total - self.http_seconds, 0.0)
+
+# [http seconds, http calls] for the command or handler currently running
+_http_accumulator: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar("http_accumulator", default=None)
+
+class Instrumentation:
+    """Wraps every app command, gateway handler and HTTP request with timers.
+
+    HTTP time is attributed to whichever command or handler made the call
+    (through a context variable, so it follows ``await`` chains). Interaction
+    responses are timed against Discord's 3 second window. Overhead is a
+    couple of ``perf_counter`` calls and dict lookups per operation.
+    """
+
+    def __init__(self):
+        self.operations: Dict[Tuple[str, str], OperationStats] = {}
+        self.http = Histogram()
+        self.late_responses = 0
+
+    def stats(self, kind: str, name: str) -> OperationStats:
+        key = (kind, name)
+        stats = self.operations.get(key)
+        if stats is None:
+            stats = self.operations[key] = OperationStats()
+        return stats
+
+    def _timed(self, kind: str, name: str, func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            stats = self.stats(kind, name)
+            accumulator = [0.0, 0]
+            token = _http_accumulator.set(accumulator)
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.wall.observe(time.perf_counter() - started)
+                stats.http_seconds += accumulator[0]
+                stats.http_calls += accumulator[1]
+                _http_accumulator.reset(token)
+                # A command that returns without responding leaves the user with "did not respond"
+                if kind == "command" and args and isinstance(args[0], discord.Interaction):
+                    if not args[0].response.is_done():
+                        stats.missed_deadline += 1
+        return wrapper
+
+    # -------------------------
+    # Installation
+    # -------------------------
+    def install(self, bot: discord.Client, tree: app_commands.CommandTree):
+        """Wrap everything registered so far; call once all commands and events exist."""
+        for command in tree.walk_commands():
+            if isinstance(command, app_commands.Command):
+                command._callback = self._timed("command", command.qualified_name, command._callback)
+        for name, handler in list(vars(bot).items()):
+            if name.startswith("on_") and inspect.iscoroutinefunction(handler):
+                setattr(bot, name, self._timed("event", name, handler))
+        self._wrap_http(bot.http)
+        self._wrap_interaction_responses()
+
+    def wrap_sync(self, obj, attr: str, kind: str, name: str):
+        """Time a synchronous method, e.g. DataManager's disk writes (also when run in a thread)."""
+        func = getattr(obj, attr)
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stats(kind, name).wall.observe(time.perf_counter() - started)
+        setattr(obj, attr, timed)
+
+    def _wrap_http(self, http):
+        request = http.request
+
+        @functools.wraps(request)
+        async def timed_request(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await request(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.http.observe(elapsed)
+                accumulator = _http_accumulator.get()
+                if accumulator is not None:
+                    accumulator[0] += elapsed
+                    accumulator[1] += 1
+        http.request = timed_request
+
+    def _wrap_interaction_responses(self):
+        """Count first responses sent after the 3 second interaction window."""
+        instrumentation = self
+
+        def wrap(method):
+            @functools.wraps(method)
+            async def timed(response: discord.InteractionResponse, *args, **kwargs):
+                interaction = getattr(response, "_parent", None)
+                if interaction is not None:
+                    age = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+                    if age > INTERACTION_DEADLINE:
+                        instrumentation.late_responses += 1
+                        command = interaction.command
+                        if command is not None:
+                            instrumentation.stats("command", command.qualified_name).missed_deadline += 1
+                return await method(response, *args, **kwargs)
+            return timed
+
+        for name in ("send_message", "defer", "edit_message", "send_modal"):
+            setattr(discord.InteractionResponse, name, wrap(getattr(discord.InteractionResponse, name)))
+
+    # -------------------------
+    # Export
+    # -------------------------
+    def summary_sections(self) -> List[Tuple[str, List[str]]]:
+        """Human-readable per-operation lines for /botstats."""
+        sections = []
+        for (kind, name), stats in sorted(self.operations.items(), key=lambda item: -item[1].wall.total):
+            wall = stats.wall
+            if not wall.count:
+                continue
+            lines = [
+                f"{wall.count} calls · avg {wall.total / wall.count * 1000:.0f}ms · "
+                f"p50 ≤{_ms(wall.quantile(0.5))} · p95 ≤{_ms(wall.quantile(0.95))}",
+            ]
+            if stats.http_calls:
+                lines.append(
+                    f"HTTP {stats.http_seconds / wall.count * 1000:.0f}ms avg over {stats.http_calls} calls · "
+                    f"local {stats.local_seconds / wall.count * 1000:.0f}ms avg"
+                )
+            if stats.errors or stats.missed_deadline:
+                lines.append(f"{stats.errors} errors · {stats.missed_deadline} missed the 3s window")
+            label = f"/{name}" if kind == "command" else f"{kind}: {name}"
+            sections.append((label, lines))
+        if self.http.count:
+            sections.append(("Discord HTTP", [
+                f"{self.http.count} requests · p50 ≤{_ms(self.http.quantile(0.5))} · p95 ≤{_ms(self.http.quantile(0.95))}",
+                f"{self.late_responses} interaction responses sent after 3s",
+            ]))
+        return sections
+
+    def collect(self) -> List[Metric]:
+        samples: List[Metric] = []
+        for (kind, name), stats in sorted(self.operations.items()):
+            samples.extend(_histogram_metrics(
+                "bot_operation_seconds", stats.wall, {"kind": kind, "name": name},
+                "Wall-clock latency of commands and gateway handlers",
+            ))
+        for metric, attr, help_text in (
+            ("bot_operation_http_seconds_total", "http_seconds", "Time spent in Discord HTTP calls"),
+            ("bot_operation_local_seconds_total", "local_seconds", "Time spent outside Discord HTTP calls"),
+            ("bot_operation_http_calls_total", "http_calls", "Discord HTTP calls made"),
+            ("bot_operation_errors_total", "errors", "Operations that raised"),
+            ("bot_operation_missed_deadline_total", "missed_deadline", "Interactions answered after (or never within) 3s"),
+        ):
+            for (kind, name), stats in sorted(self.operations.items()):
+                samples.append(Metric(metric, getattr(stats, attr), "counter", help_text, {"kind": kind, "name": name}))
+        samples.extend(_histogram_metrics("bot_discord_http_seconds", self.http, None, "Discord HTTP request latency"))
+        return samples
+
+def _ms(seconds: float) -> str:
+    return "10s+" if seconds == float("inf") else f"{seconds * 1000:g}ms"
+
+def _histogram_metrics(name: str, histogram: Histogram, labels: Optional[Dict[str, str]], help_text: str) -> List[Metric]:
+    labels = labels or {}
+    samples = []
+    cumulative = 0
+    for bound, count in zip(BUCKETS + (float("inf"),), histogram.counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        samples.append(Metric(f"{name}_bucket", cumulative, "histogram", help_text, {**labels, "le": le}))
+    samples.append(Metric(f"{name}_sum", histogram.total, "histogram", labels=labels))
+    samples.append(Metric(f"{name}_count", histogram.count, "histogram", labels=labels))
+    return samples
@@ -1,16 +0,0 @@
-from flask import Flask
-from threading import Thread
-import os
-
-app = Flask("")
-
-@app.route("/")
-def home():
-    return "Variety Friday Bot is online!"
-
-def run():
-    app.run(host="0.0.0.0", port=8080)
-
-def keep_alive():
-    t = Thread(target=run)
-    t.start()
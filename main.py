@@ -2,18 +2,38 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import asyncio
 import datetime
-import pytz
 import logging
-import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import config
 from data_manager import DataManager
-
-# keep alive
-from keep_alive import keep_alive
-
-keep_alive()  # starts the server in another thread
+from sqlite_backend import SQLiteBackend
+from dm_dispatcher import DeliveryReport, DMDispatcher
+from dm_outbox import DMOutbox
+from blocklist import BlocklistMatcher
+from voting_view import VoteView
+from confirm_view import ConfirmView
+from reaction_seeder import ReactionSeeder
+from embed_updater import EmbedUpdater
+from pagination import RenderCache, paginate_fields, send_pages
+from permissions import permissions
+from command_sync import sync_if_changed
+from utils import create_games_pages, create_participants_pages, create_variety_events
+from reconcile import (
+    apply_multi_vote_policy, ballots_from_reactions, count_vote_changes, fetch_exact_tally,
+    fetch_reaction_users, registration_delta, choices_from_reactions,
+)
+import voting
+from health_server import HealthServer, Metric
+from instrumentation import Instrumentation
+from profiler import LoopLagMonitor, SamplingProfiler
+from scheduler import Scheduler, Stage
+from recurrence import Occurrence, event_times
+from aiohttp import web
 
 # -------------------------
 # Logging
@@ -30,185 +50,480 @@ intents.guilds = True
 intents.members = True
 intents.reactions = True
 
-bot = commands.Bot(command_prefix="!", intents=intents)
-data = DataManager()  # Data persists via JSON
+startup_started = time.perf_counter()
+first_ready = True
+
+class VarietyBot(commands.Bot):
+    async def close(self):
+        # Stop our services while the event loop is still running
+        await scheduler.close()
+        await health_server.stop()
+        await loop_monitor.close()
+        profiler.stop()
+        await dm_outbox.close()
+        await reaction_seeder.close()
+        await data.close()  # After everything that writes to it
+        await super().close()
+
+# Reactions are tracked through raw events, so no message cache is needed
+bot = VarietyBot(command_prefix="!", intents=intents, max_messages=None)
+data = DataManager(
+    config.DATA_FILE,
+    write_behind=config.DATA_WRITE_BEHIND,
+    flush_interval=config.DATA_FLUSH_INTERVAL,
+    flush_batch_size=config.DATA_FLUSH_BATCH_SIZE,
+    journal=config.DATA_JOURNAL,
+    journal_compact_bytes=config.DATA_JOURNAL_COMPACT_BYTES,
+    backend=SQLiteBackend(config.DATA_SQLITE_FILE) if config.DATA_BACKEND == "sqlite" else None,
+    max_games=config.MAX_COMPONENT_VOTING_OPTIONS if config.VOTING_MODE == "components" else config.MAX_VOTING_OPTIONS,
+)  # Data persists via JSON (or SQLite)
+dm_dispatcher = DMDispatcher(bot, concurrency=config.DM_CONCURRENCY, retries=config.DM_MAX_RETRIES)
+dm_outbox = DMOutbox(
+    data,
+    dm_dispatcher,
+    guild_id=config.GUILD_ID,
+    workers=config.DM_OUTBOX_WORKERS,
+    per_second=config.DM_OUTBOX_PER_SECOND,
+)
+reaction_seeder = ReactionSeeder()
+
+# Rendered /help, /listgames and /participants pages, keyed on DataManager versions
+render_cache = RenderCache()
+
+# Keep references to fire-and-forget tasks so they aren't garbage collected
+background_tasks = set()
 
 # -------------------------
 # Helper functions
 # -------------------------
 def allowed(ctx: discord.Interaction) -> bool:
-    """Check if user has allowed roles."""
-    if not ctx.user.guild:
-        return False
-    user_roles = [role.name.lower() for role in ctx.user.roles]
-    allowed_roles = [r.lower() for r in config.ALLOWED_ROLES]
-    return any(role in allowed_roles for role in user_roles)
+    """Check if user has allowed roles (or is an administrator)."""
+    return permissions.is_allowed(ctx)
 
 def get_guild(bot: commands.Bot) -> discord.Guild:
     return bot.get_guild(config.GUILD_ID)
 
+def game_choices(names: List[str]) -> List[app_commands.Choice[str]]:
+    # Discord caps choice names and values at 100 characters
+    return [app_commands.Choice(name=n[:100], value=n[:100]) for n in names]
+
+def run_in_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+NUMBER_EMOJIS = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️⃣","8️⃣","9️⃣","🔟"]
+NUMBER_EMOJI_INDEX = {emoji: i for i, emoji in enumerate(NUMBER_EMOJIS)}
+REGISTER_STATUS = {"✅": "yes", "❌": "no", "❔": "maybe"}
+
+# Vote/tie messages whose stored tally is known to match Discord. Anything
+# else (i.e. after a restart) is rebuilt from the reactions before use.
+reconciled_tallies = set()
+
+def tally_options(message_id: int) -> int:
+    """Number of options on a vote or tiebreak message (0 if neither)."""
+    if message_id == data.vote_message_id:
+        return len(data.games)
+    if message_id == data.tie_message_id:
+        return len(data.tie_options or [])
+    return 0
+
+def ranked_ballots(message_id: int) -> bool:
+    """Whether picks on a message build up a ballot rather than replace each other.
+
+    Tiebreak rounds are always a simple one-vote plurality.
+    """
+    return message_id == data.vote_message_id and data.voting_method != "plurality"
+
+def record_component_vote(message_id: int, user_id: int, option: int) -> Optional[bytes]:
+    """VoteView callback; returns the user's ballot, or None if the message's vote has closed."""
+    if data.voting_mode != "components" or not option < tally_options(message_id):
+        return None
+    if ranked_ballots(message_id) and option in data.ballot(message_id, user_id):
+        data.remove_vote(message_id, user_id, option)
+    else:
+        data.record_vote(message_id, user_id, option, ranked=ranked_ballots(message_id))
+    vote_embeds.notify(message_id)
+    return data.ballot(message_id, user_id)
+
+def attach_vote_views():
+    """Re-register the persistent vote menus so they keep working after a restart.
+
+    Component votes never show up as reactions, so their stored tally is
+    already authoritative.
+    """
+    if data.voting_mode != "components":
+        return
+    for message_id, options in ((data.vote_message_id, data.games), (data.tie_message_id, data.tie_options)):
+        if message_id and options:
+            view = VoteView(options, record_component_vote, ranked=ranked_ballots(message_id))
+            bot.add_view(view, message_id=message_id)
+            reconciled_tallies.add(message_id)
+
+async def fetch_tally(channel, message_id: int) -> Optional[Dict[int, bytes]]:
+    """Read a vote/tiebreak tally straight from the message's reactions."""
+    emojis = NUMBER_EMOJIS[:tally_options(message_id)]
+    users_by_emoji = await fetch_reaction_users(channel, message_id, emojis)
+    if users_by_emoji is None:
+        return None
+    if ranked_ballots(message_id):
+        return ballots_from_reactions(users_by_emoji, emojis, lambda user_id: data.ballot(message_id, user_id))
+    return {user_id: bytes(options) for user_id, options in choices_from_reactions(users_by_emoji, emojis).items()}
+
+def apply_tally(message_id: int, votes: Dict[int, bytes], before: Dict[int, bytes]) -> int:
+    """Merge a tally read from Discord into the stored one; returns how many votes changed.
+
+    ``before`` is the stored tally from when the reactions started being
+    paged. Users whose ballot changed since then had a reaction event handled
+    meanwhile, which is newer than the fetch, so their live ballot is kept.
+    """
+    live = data.votes(message_id)
+    merged = dict(live)
+    for user_id in votes.keys() | before.keys():
+        if live.get(user_id) != before.get(user_id):
+            continue
+        if user_id in votes:
+            merged[user_id] = votes[user_id]
+        else:
+            merged.pop(user_id, None)
+    changes = count_vote_changes(live, merged)
+    if changes:
+        data.replace_votes(message_id, merged)
+        vote_embeds.notify(message_id)
+    reconciled_tallies.add(message_id)
+    return changes
+
+async def reconcile_tally(channel, message_id: int) -> bool:
+    """Rebuild a stored tally from the message's reactions, one vote per user."""
+    before = dict(data.votes(message_id))
+    votes = await fetch_tally(channel, message_id)
+    if votes is None:
+        return False
+    apply_tally(message_id, votes, before)
+    return True
+
+def stored_ballots(message_id: int) -> Tuple[Dict[int, Sequence[int]], bool]:
+    """The stored ballots as they should be counted, and whether to split them.
+
+    For reaction plurality votes a stored ballot is every option the user
+    reacted to, so VOTE_MULTI_POLICY is applied the same way the exact
+    count does.
+    """
+    ballots = data.votes(message_id)
+    if data.voting_mode == "reactions" and not ranked_ballots(message_id):
+        ballots = apply_multi_vote_policy({u: list(b) for u, b in ballots.items()}, config.VOTE_MULTI_POLICY)
+        return ballots, config.VOTE_MULTI_POLICY == "split"
+    return ballots, False
+
+async def count_vote(channel, message_id: int, num_options: int) -> Optional[voting.VoteResult]:
+    """Count a vote or tiebreak message; None if the message is gone.
+
+    In "live" tally mode this counts the stored tally, rebuilding it from
+    the reactions first if it may be stale. In "exact" mode every option's
+    reactions are re-read from Discord. Either way VOTE_MULTI_POLICY decides
+    what happens to people who reacted to more than one option.
+    """
+    split = False
+    if config.VOTE_TALLY_MODE == "exact" and data.voting_mode == "reactions":
+        emojis = NUMBER_EMOJIS[:num_options]
+        exact = await fetch_exact_tally(channel, message_id, emojis)
+        if exact is None:
+            return None
+        logger.info(f"Exact tally for message {message_id}: {exact.summary()}")
+        if ranked_ballots(message_id):
+            ballots = ballots_from_reactions(exact.users_by_emoji, emojis, lambda user_id: data.ballot(message_id, user_id))
+        else:
+            ballots = apply_multi_vote_policy(exact.choices, config.VOTE_MULTI_POLICY)
+            split = config.VOTE_MULTI_POLICY == "split"
+    else:
+        if message_id not in reconciled_tallies and not await reconcile_tally(channel, message_id):
+            return None
+        ballots, split = stored_ballots(message_id)
+
+    if ranked_ballots(message_id):
+        return voting.tally(data.voting_method, ballots.values(), num_options, seed=message_id)
+    return voting.plurality(ballots.values(), num_options, seed=message_id, split=split)
+
+async def fetch_registrations(channel, message_id: int) -> Optional[Dict[int, Optional[str]]]:
+    """Diff the reminder's reactions against the stored participants."""
+    users_by_emoji = await fetch_reaction_users(channel, message_id, list(REGISTER_STATUS))
+    if users_by_emoji is None:
+        return None
+    registered = data.yes_participants | data.no_participants | data.maybe_participants
+    return registration_delta(users_by_emoji, REGISTER_STATUS, data.participant_status, registered)
+
+async def reconcile_on_startup():
+    """Replay reactions added or removed while the bot was offline.
+
+    The reminder, vote and tiebreak messages are fetched concurrently and
+    the combined delta is written in one batch. Anyone whose status or
+    ballot changed through a live reaction event during the fetch keeps it.
+    """
+    started = time.perf_counter()
+    registered = data.yes_participants | data.no_participants | data.maybe_participants
+    statuses_before = {user_id: data.participant_status(user_id) for user_id in registered}
+    tallies_before = {}
+    jobs = {}
+    for message_id, channel_id, fetch in (
+        (data.reminder_message_id, data.reminder_channel_id, fetch_registrations),
+        (data.vote_message_id, data.vote_channel_id, fetch_tally),
+        (data.tie_message_id, data.tie_channel_id, fetch_tally),
+    ):
+        if message_id in reconciled_tallies:
+            continue
+        channel = bot.get_channel(channel_id) if message_id and channel_id else None
+        if message_id and channel is None:
+            logger.warning(f"Cannot reconcile message {message_id}: channel unknown")
+        if channel is not None:
+            jobs[message_id] = fetch(channel, message_id)
+            tallies_before[message_id] = dict(data.votes(message_id))
+
+    results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+    changes = 0
+    with data.batch():
+        for message_id, result in zip(jobs, results):
+            if isinstance(result, Exception) or result is None:
+                logger.warning(f"Could not reconcile message {message_id}: {result}")
+            elif message_id == data.reminder_message_id:
+                for user_id, status in result.items():
+                    if data.participant_status(user_id) == statuses_before.get(user_id):
+                        data.set_participant_status(user_id, status)
+                        changes += 1
+            else:
+                changes += apply_tally(message_id, result, tallies_before[message_id])
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Startup reconciliation applied {changes} changes in {elapsed:.2f}s")
+
 # -------------------------
 # Bot events
 # -------------------------
 @bot.event
-async def on_ready():
-    logger.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
-    logger.info("------")
+async def setup_hook():
+    await health_server.start()
+    loop_monitor.start()
+    data.start_flusher()
+    dm_outbox.start()
+    attach_vote_views()
+    if data.vote_message_id and data.vote_channel_id and config.VOTE_EMBED_REFRESH_SECONDS > 0:
+        vote_embeds.track(data.vote_channel_id, data.vote_message_id)
+
+    # Runs once per process, not on every gateway reconnect like on_ready
     try:
-        synced = await bot.tree.sync()
-        logger.info(f"Synced {len(synced)} commands")
+        data.command_tree_hash = await sync_if_changed(bot, bot.tree, config.GUILD_ID, data.command_tree_hash)
     except Exception as e:
         logger.error(f"Error syncing commands: {e}")
 
-    # Restore vote/tiebreak messages if bot restarted mid-vote
-    guild = get_guild(bot)
-    if guild and data.vote_message_id:
-        try:
-            channel = guild.get_channel(config.TEXT_CHANNEL_ID)
-            data._vote_message = await channel.fetch_message(data.vote_message_id)
-        except:
-            data.vote_message_id = None
-    if guild and getattr(data, 'tie_message_id', None):
-        try:
-            channel = guild.get_channel(config.TEXT_CHANNEL_ID)
-            data._tie_message = await channel.fetch_message(data.tie_message_id)
-        except:
-            data.tie_message_id = None
+# -------------------------
+# Health and metrics
+# -------------------------
+health_server = HealthServer(bot, config.HEALTH_HOST, config.HEALTH_PORT, max_latency=config.HEALTH_MAX_LATENCY)
+
+def app_metrics() -> List[Metric]:
+    samples = [
+        Metric("bot_data_dirty", 1.0 if data.dirty else 0.0, help="1 while changes are waiting to be written"),
+        Metric("bot_background_tasks", len(background_tasks), help="Fire-and-forget tasks still running"),
+        Metric("bot_dm_outbox_pending", dm_outbox.pending, help="Queued registration DMs"),
+        Metric("bot_reaction_seeding_pending", reaction_seeder.pending, help="Messages still being seeded with reactions"),
+        Metric("bot_vote_embed_edits_per_minute", vote_embeds.edits_per_minute, help="Live vote embed edit rate"),
+    ]
+    samples += [
+        Metric("bot_dm_outbox_total", count, "counter", "Registration DM outbox events", {"event": event})
+        for event, count in dm_outbox.stats.items()
+    ]
+    samples += [
+        Metric("bot_vote_embed_total", count, "counter", "Live vote embed refresh events", {"event": event})
+        for event, count in vote_embeds.metrics.items()
+    ]
+    samples += [
+        Metric("bot_render_cache_total", render_cache.hits, "counter", "Paginated embed cache lookups", {"result": "hit"}),
+        Metric("bot_render_cache_total", render_cache.misses, "counter", labels={"result": "miss"}),
+    ]
+    return samples
+
+health_server.add_collector(app_metrics)
+
+# Commands, handlers and HTTP calls are wrapped just before the bot starts
+instrumentation = Instrumentation()
+instrumentation.wrap_sync(data, "_write_payload", "storage", "write")
+instrumentation.wrap_sync(data, "_serialize", "storage", "serialize")
+health_server.add_collector(instrumentation.collect)
+
+# -------------------------
+# Profiling
+# -------------------------
+profiler = SamplingProfiler(config.PROFILE_DIR, interval=config.PROFILE_INTERVAL)
+loop_monitor = LoopLagMonitor(threshold=config.LOOP_LAG_THRESHOLD)
+health_server.add_collector(lambda: [
+    Metric("bot_loop_stalls_total", loop_monitor.stats["stalls"], "counter", "Times a callback blocked the event loop"),
+    Metric("bot_loop_lag_seconds", loop_monitor.stats["last_lag_seconds"], help="Latest event loop scheduling lag"),
+    Metric("bot_loop_lag_max_seconds", loop_monitor.stats["max_lag_seconds"], help="Worst event loop lag since startup"),
+    Metric("bot_profiler_running", 1.0 if profiler.running else 0.0, help="1 while the sampling profiler is on"),
+])
+
+def toggle_profiler(action: str) -> Tuple[str, Optional[Path]]:
+    """Start or stop the sampling profiler on the event loop thread.
+
+    Returns a status line and, after a stop, the collapsed-stack file.
+    """
+    if action == "start":
+        if not profiler.start():
+            return "The profiler is already running.", None
+        return "Profiler started. Use `stop` to write the flamegraph file.", None
+    path = profiler.stop()
+    if path is None:
+        return "The profiler isn't running.", None
+    return f"Profiler stopped: {profiler.sample_count} samples written to `{path}`.", path
+
+async def profile_endpoint(request: web.Request) -> web.Response:
+    """POST /debug/profile?action=start|stop with a Bearer PROFILE_TOKEN."""
+    if not config.PROFILE_HTTP_TOKEN or request.headers.get("Authorization") != f"Bearer {config.PROFILE_HTTP_TOKEN}":
+        return web.Response(status=403, text="Forbidden\n")
+    action = request.query.get("action")
+    if action not in ("start", "stop"):
+        return web.Response(status=400, text="action must be start or stop\n")
+    status, _ = toggle_profiler(action)
+    return web.Response(text=status + "\n")
+
+health_server.add_route("POST", "/debug/profile", profile_endpoint)
+
+# Keep the permission cache in step with role changes
+@bot.event
+async def on_guild_role_create(role: discord.Role):
+    permissions.on_role_change(role)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    permissions.on_role_change(role)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    permissions.on_role_update(before, after)
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    permissions.on_member_update(before, after)
+
+@bot.event
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent):
+    permissions.forget_member(payload.guild_id, payload.user.id)
+
+@bot.event
+async def on_ready():
+    global first_ready
+    logger.info(f"Logged in as {bot.user} (ID: {bot.user.id})")
+    if first_ready:
+        first_ready = False
+        logger.info(f"Ready {time.perf_counter() - startup_started:.2f}s after startup")
+        if config.SCHEDULE_ENABLED:
+            # Stages need the guild and channel caches, so start once they're filled
+            scheduler.start()
+    logger.info("------")
+
+    # Catch up on reactions missed while the bot was offline
+    await reconcile_on_startup()
 
 # -------------------------
 # /help command
 # -------------------------
 @bot.tree.command(name="help", description="Show available commands")
 async def help_command(interaction: discord.Interaction):
-    embed = discord.Embed(title="Variety Friday Commands", color=discord.Color.blue())
-    for cmd in bot.tree.walk_commands():
-        try:
-            embed.add_field(name=f"/{cmd.name}", value=cmd.description, inline=False)
-        except:
-            continue
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    # The command tree doesn't change at runtime, so one render lasts forever
+    pages = render_cache.get("help", 0, lambda: paginate_fields(
+        "Variety Friday Commands",
+        [(f"/{cmd.name}", [cmd.description or "-"]) for cmd in bot.tree.walk_commands()],
+        discord.Color.blue(),
+    ))
+    await send_pages(interaction, pages)
 
 # -------------------------
 # /createevent
 # -------------------------
-@bot.tree.command(name="createevent", description="Create a new Variety Friday event")
-async def createevent(interaction: discord.Interaction):
+async def create_events(occurrences: List[Occurrence]) -> str:
+    """Create (or reuse) the events for ``occurrences``; returns a status line."""
     guild = get_guild(bot)
     if not guild:
-        await interaction.response.send_message("Guild not found.", ephemeral=True)
-        return
-
-    voice_channel = guild.get_channel(config.VOICE_CHANNEL_ID)
-    if not voice_channel:
-        await interaction.response.send_message("Voice channel not found.", ephemeral=True)
-        return
-
-    tz = pytz.timezone(config.TIMEZONE)
-    now = datetime.datetime.now(tz)
-
-    days_until_friday = (4 - now.weekday() + 7) % 7
-    if days_until_friday == 0 and now.hour >= config.EVENT_START_HOUR:
-        days_until_friday = 7
+        return "Guild not found."
 
-    start_time = now.replace(hour=config.EVENT_START_HOUR, minute=0, second=0, microsecond=0) + datetime.timedelta(days=days_until_friday)
-    end_time = start_time + datetime.timedelta(hours=config.EVENT_DURATION_HOURS)
+    events = await create_variety_events(guild, occurrences)
+    if not events:
+        return "Could not create the event (see the logs)."
 
-    event = await guild.create_scheduled_event(
-        name=config.EVENT_NAME,
-        start_time=start_time.astimezone(pytz.UTC),
-        end_time=end_time.astimezone(pytz.UTC),
-        description=config.EVENT_DESCRIPTION,
-        privacy_level=discord.PrivacyLevel.guild_only,
-        entity_type=discord.EntityType.voice,
-        channel=voice_channel
-    )
+    # The nearest event is the one /register and /startevent work with
+    if data.last_event_id != events[0].id:
+        data.last_event_id = events[0].id
+        data.clear_dm_delivered()
+    lines = [
+        f"{event.name} for {occurrence.start.strftime('%A, %d %B %Y %H:%M %Z')}"
+        for event, occurrence in zip(events, occurrences)
+    ]
+    status = f"Event created: {lines[0]}" if len(occurrences) == 1 else "Events ready:\n" + "\n".join(lines)
+    if len(events) < len(occurrences):
+        status += f"\nOnly {len(events)} of {len(occurrences)} events could be created (see the logs)."
+    return status
 
-    data.last_event_id = event.id
-    await interaction.response.send_message(f"Event created: {event.name} for {start_time.strftime('%A, %d %B %Y %H:%M %Z')}", ephemeral=True)
+@bot.tree.command(name="createevent", description="Create the next Variety Friday event(s)")
+@app_commands.describe(count="How many upcoming weeks to create events for (more than one: roles only)")
+async def createevent(interaction: discord.Interaction, count: app_commands.Range[int, 1, config.EVENT_HORIZON_WEEKS] = 1):
+    if count > 1 and not allowed(interaction):
+        await interaction.response.send_message("You don't have permission to create several events at once.", ephemeral=True)
+        return
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    await interaction.followup.send(await create_events(event_times.upcoming(count)), ephemeral=True)
 
 # -------------------------
-# /register command
+# /register and /reminder commands
 # -------------------------
-@bot.tree.command(name="register", description="Announce the event and allow people to register")
-async def register(interaction: discord.Interaction):
+async def announce_event(channel, reminder: bool = False) -> str:
+    """Post the registration (or reminder) embed in ``channel``; returns a status line."""
     guild = get_guild(bot)
     if not guild or not data.last_event_id:
-        await interaction.response.send_message("No upcoming event found.", ephemeral=True)
-        return
+        return "No upcoming event found."
 
     event = await guild.fetch_scheduled_event(data.last_event_id)
     if not event:
-        await interaction.response.send_message("Event not found.", ephemeral=True)
-        return
+        return "Event not found."
 
     # Ping @everyone
-    await interaction.channel.send(
-        "@everyone Variety Friday is coming! 🎉",
+    await channel.send(
+        "@everyone Variety Friday Reminder! 🎉" if reminder else "@everyone Variety Friday is coming! 🎉",
         allowed_mentions=discord.AllowedMentions(everyone=True)
     )
 
+    description = f"React below if you're attending!\n[event link 🗓️]({event.url})"
+    if not reminder:
+        description += "\nDon't forget to add your game suggestions using /addgame!"
     embed = discord.Embed(
         title=f"{config.EVENT_NAME} is coming!",
-        description=f"React below if you're attending!\n[event link 🗓️]({event.url})\nDon't forget to add your game suggestions using /addgame!",
-        color=discord.Color.green()
+        description=description,
+        color=discord.Color.gold() if reminder else discord.Color.green()
     )
-    msg = await interaction.channel.send(embed=embed)
-    for emoji in ["✅", "❌", "❔"]:
-        await msg.add_reaction(emoji)
-
+    msg = await channel.send(embed=embed)
+    data.reminder_channel_id = channel.id
     data.reminder_message_id = msg.id
-    await interaction.response.send_message("Event announcement sent!", ephemeral=True)
+    reaction_seeder.seed(msg, REGISTER_STATUS)
+    return "Reminder sent!" if reminder else "Event announcement sent!"
+
+@bot.tree.command(name="register", description="Announce the event and allow people to register")
+async def register(interaction: discord.Interaction):
+    await interaction.response.send_message(await announce_event(interaction.channel), ephemeral=True)
 
-# -------------------------
-# /reminder command
-# -------------------------
 @bot.tree.command(name="reminder", description="Send a reminder about the event")
 async def reminder(interaction: discord.Interaction):
-    guild = get_guild(bot)
-    if not guild or not data.last_event_id:
-        await interaction.response.send_message("No upcoming event found.", ephemeral=True)
-        return
-
-    event = await guild.fetch_scheduled_event(data.last_event_id)
-    if not event:
-        await interaction.response.send_message("Event not found.", ephemeral=True)
-        return
-
-    # Ping @everyone
-    await interaction.channel.send(
-        "@everyone Variety Friday Reminder! 🎉",
-        allowed_mentions=discord.AllowedMentions(everyone=True)
-    )
-
-    embed = discord.Embed(
-        title=f"{config.EVENT_NAME} is coming!",
-        description=f"React below if you're attending!\n[event link 🗓️]({event.url})",
-        color=discord.Color.gold()
-    )
-    msg = await interaction.channel.send(embed=embed)
-    for emoji in ["✅", "❌", "❔"]:
-        await msg.add_reaction(emoji)
+    await interaction.response.send_message(await announce_event(interaction.channel, reminder=True), ephemeral=True)
 
-    data.reminder_message_id = msg.id
-    await interaction.response.send_message("Reminder sent!", ephemeral=True)
-    # -------------------------
+# -------------------------
 # Blocked games helper
 # -------------------------
+blocklist = BlocklistMatcher(config.BLOCKLIST_FILE)
+data.catalog.enable_fuzzy(blocklist.normalize)  # Same normalization as the blocklist
+
 def is_blocked_game(name: str) -> bool:
-    blocked_keywords = [
-        "death note", "dn", "dnkw", "death note killer within",
-        "cooked", "washed", "kira", "downtown", "toy town", "toytown", "note"
-    ]
-    leet_map = str.maketrans({'4': 'a','@': 'a','3': 'e','1': 'i','!': 'i','0': 'o','5': 's','$': 's','7': 't'})
-    name_normalized = name.lower().translate(leet_map)
-    name_clean = re.sub(r'[^a-z0-9]', '', name_normalized)
-    if re.fullmatch(r'\s*L\s*', name, re.IGNORECASE):
-        return True
-    for word in blocked_keywords:
-        word_clean = re.sub(r'[^a-z0-9]', '', word.lower())
-        if word_clean in name_clean:
-            return True
-    return False
+    match = blocklist.match(name)
+    if match:
+        logger.info(f"Blocked game {name!r} ({match.rule}: {match.entry!r})")
+    return match is not None
 
 # -------------------------
 # /addgame command
@@ -221,9 +536,8 @@ async def addgame(interaction: discord.Interaction, name: str):
             description=f"{interaction.user.mention} tried to add a game while voting is open!",
             color=discord.Color.red()
         )
-        msg = await interaction.channel.send(embed=embed)
-        for emoji in ["⏰", "❌", "😂"]:
-            await msg.add_reaction(emoji)
+        await interaction.response.send_message(embed=embed)
+        reaction_seeder.seed(await interaction.original_response(), ["⏰", "❌", "😂"])
         return
 
     if is_blocked_game(name):
@@ -232,16 +546,46 @@ async def addgame(interaction: discord.Interaction, name: str):
             description=f"{interaction.user.mention} tried to add Death Note - Please add another game!",
             color=discord.Color.red()
         )
-        msg = await interaction.channel.send(embed=embed)
-        for emoji in ["🚨", "❌", "😱"]:
-            await msg.add_reaction(emoji)
+        await interaction.response.send_message(embed=embed)
+        reaction_seeder.seed(await interaction.original_response(), ["🚨", "❌", "😱"])
         return
 
+    # Same name once punctuation, spacing and leetspeak are folded away: "among-us" vs "Among Us"
+    duplicate = data.catalog.near_duplicate(name, within=data.game_keys)
+    if duplicate and duplicate.score == 1.0:
+        await interaction.response.send_message(
+            f"**{name}** is the same as **{duplicate.name}**, which is already on the list.",
+            ephemeral=True
+        )
+        return
+    if duplicate:
+        # Only similar ("Phasmophobia VR" vs "Phasmophobia"): suggest, but let them add it
+        async def add_anyway(confirmation: discord.Interaction):
+            await confirmation.followup.send(add_game(name))
+
+        await interaction.response.send_message(
+            f"**{name}** looks like **{duplicate.name}** ({duplicate.score:.0%} similar), which is already on the list. Add it anyway?",
+            view=ConfirmView("Add anyway", add_anyway),
+            ephemeral=True
+        )
+        return
+
+    await interaction.response.send_message(add_game(name), ephemeral=False)
+
+def add_game(name: str) -> str:
+    """Add a checked game to the list; returns the public reply."""
+    if data.vote_message_id is not None and data.tie_message_id is None:
+        return "Voting has already started."
+    name = data.catalog.get(name) or name  # Reuse the spelling from earlier weeks
+
     if data.addgame(name):
         games_list = ", ".join(data.games)
-        await interaction.response.send_message(f"Game added: {name}\nCurrent games: {games_list}", ephemeral=False)
-    else:
-        await interaction.response.send_message("Cannot add more than 10 games or game already exists.", ephemeral=False)
+        return f"Game added: {name}\nCurrent games: {games_list}"
+    return f"Cannot add more than {data.max_games} games or game already exists."
+
+@addgame.autocomplete("name")
+async def addgame_autocomplete(interaction: discord.Interaction, current: str):
+    return game_choices(data.catalog.suggest(current))
 
 # -------------------------
 # /removegame command
@@ -256,18 +600,17 @@ async def removegame(interaction: discord.Interaction, name: str):
     else:
         await interaction.response.send_message("Game not found.", ephemeral=True)
 
+@removegame.autocomplete("name")
+async def removegame_autocomplete(interaction: discord.Interaction, current: str):
+    return game_choices(data.suggest_games(current))
+
 # -------------------------
 # /listgames command
 # -------------------------
 @bot.tree.command(name="listgames", description="List all current games")
 async def listgames(interaction: discord.Interaction):
-    if not data.games:
-        await interaction.response.send_message("No games added yet.", ephemeral=False)
-        return
-    await interaction.response.send_message(
-        "Current games:\n" + "\n".join(f"{i+1}. {g}" for i, g in enumerate(data.games)),
-        ephemeral=False
-    )
+    pages = render_cache.get("listgames", data.version("games"), lambda: create_games_pages(data.games))
+    await send_pages(interaction, pages)
 
 # -------------------------
 # /resetgames command
@@ -283,127 +626,211 @@ async def resetgames(interaction: discord.Interaction):
 # -------------------------
 # /startvote command
 # -------------------------
-@bot.tree.command(name="startvote", description="Start the game vote")
-async def startvote(interaction: discord.Interaction):
+VOTE_INSTRUCTIONS = {
+    "reactions": {
+        "plurality": "React below to cast your vote!",
+        "approval": "React to every game you'd be happy to play!",
+        "irv": "React in order of preference - your first reaction is your top pick!",
+    },
+    "components": {
+        "plurality": "Pick a game from the menu below to cast your vote!",
+        "approval": "Pick every game you'd be happy to play from the menu below!",
+        "irv": "Pick games from the menu below in order of preference!",
+    },
+}
+
+def build_vote_embed(
+    games: List[str],
+    scores: Optional[List[float]] = None,
+    voting_mode: Optional[str] = None,
+    voting_method: Optional[str] = None,
+) -> discord.Embed:
+    """The /startvote embed; with ``scores`` each option gets a standings bar.
+
+    The footer explains the stored voting mode and method unless others are given.
+    """
+    if scores is None:
+        options_text = "\n".join(f"{i+1}. {game}" for i, game in enumerate(games))
+    else:
+        top = max(scores, default=0) or 1
+        options_text = "\n".join(
+            f"{i+1}. {game} `{'█' * round(10 * score / top):<10}` {float(score):g}"
+            for i, (game, score) in enumerate(zip(games, scores))
+        )
+    embed = discord.Embed(
+        title="👾 TIME TO VOTE! 👾",
+        description=f"Vote for what we’ll play this Variety Friday!🎮\n\n{options_text}"[:4096],  # Discord's cap
+        color=discord.Color.blue()
+    )
+    embed.set_footer(text=VOTE_INSTRUCTIONS[voting_mode or data.voting_mode][voting_method or data.voting_method])
+    return embed
+
+def render_vote_embed(message_id: int) -> Optional[discord.Embed]:
+    """Current standings for the open vote, from the in-memory tally."""
+    if message_id != data.vote_message_id:
+        return None
+    games = list(data.games)
+    if data.voting_method == "approval":
+        scores = voting.approval(data.votes(message_id).values(), len(games)).scores
+    elif ranked_ballots(message_id):
+        scores = data.vote_counts(message_id, len(games))  # First choices for IRV
+    else:
+        # Counted exactly like the final tally so the bars match the winner
+        ballots, split = stored_ballots(message_id)
+        scores = voting.plurality(ballots.values(), len(games), split=split).scores
+    return build_vote_embed(games, scores)
+
+vote_embeds = EmbedUpdater(bot, render_vote_embed, min_interval=config.VOTE_EMBED_REFRESH_SECONDS)
+
+async def open_vote(channel) -> str:
+    """Post the vote message for the current games in ``channel``; returns a status line."""
     if data.vote_message_id is not None:
-        await interaction.response.send_message("A vote is already in progress!", ephemeral=True)
-        return
+        return "A vote is already in progress!"
 
     if not data.games:
-        await interaction.response.send_message("No games available to vote for.", ephemeral=True)
-        return
+        return "No games available to vote for."
 
-    await interaction.channel.send(
+    await channel.send(
         "@everyone It's time to vote! 🎉",
         allowed_mentions=discord.AllowedMentions(everyone=True)
     )
 
-    options_text = "\n".join(f"{i+1}. {game}" for i, game in enumerate(data.games))
-    embed = discord.Embed(
-        title="👾 TIME TO VOTE! 👾",
-        description=f"Vote for what we’ll play this Variety Friday!🎮\n\n{options_text}",
-        color=discord.Color.blue()
-    )
-    embed.set_footer(text="React below to cast your vote!")
-
-    vote_msg = await interaction.channel.send(embed=embed)
-    number_emojis = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️⃣","8️⃣","9️⃣","🔟"]
-    for i in range(len(data.games)):
-        await vote_msg.add_reaction(number_emojis[i])
+    mode, method = config.VOTING_MODE, config.VOTING_METHOD
+    embed = build_vote_embed(data.games, voting_mode=mode, voting_method=method)
+    if mode == "components":
+        # One send: the menu carries every option, no reactions to seed
+        view = VoteView(list(data.games), record_component_vote, ranked=method != "plurality")
+        vote_msg = await channel.send(embed=embed, view=view)
+    else:
+        vote_msg = await channel.send(embed=embed)
+    # Track the message before seeding so early votes are counted
+    reconciled_tallies.add(vote_msg.id)
+    with data.batch():  # One write, so a crash never leaves a half-opened vote
+        data.voting_mode = mode
+        data.voting_method = method
+        data.vote_channel_id = channel.id
+        data.vote_message_id = vote_msg.id
+    if config.VOTE_EMBED_REFRESH_SECONDS > 0:
+        vote_embeds.track(vote_msg.channel.id, vote_msg.id)
+    if mode == "reactions":
+        reaction_seeder.seed(vote_msg, NUMBER_EMOJIS[:len(data.games)])
+    return "Vote started!"
 
-    data.vote_message_id = vote_msg.id
+@bot.tree.command(name="startvote", description="Start the game vote")
+async def startvote(interaction: discord.Interaction):
+    await interaction.response.send_message(await open_vote(interaction.channel), ephemeral=True)
 
 # -------------------------
-# Participants tracking
+# Reaction tracking
 # -------------------------
+# Raw events fire whether or not the message is in the cache, so
+# registrations and votes survive restarts and busy channels.
 @bot.event
-async def on_reaction_add(reaction, user):
-    if user.bot:
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    if payload.user_id == bot.user.id or (payload.member and payload.member.bot):
+        return
+    emoji = str(payload.emoji)
+    if payload.message_id == data.reminder_message_id:
+        status = REGISTER_STATUS.get(emoji)
+        if status is None:
+            return
+        data.set_participant_status(payload.user_id, status)
+        if emoji == "✅":
+            dm_outbox.enqueue(
+                payload.user_id,
+                f"Thanks for registering for {config.EVENT_NAME} - See you there! 🎉",
+                dedupe_key=f"register:{data.last_event_id}:{payload.user_id}",
+            )
+        return
+    if data.voting_mode != "reactions":
         return
-    if reaction.message.id == data.reminder_message_id:
-        if str(reaction.emoji) == "✅":
-            data.add_yes_participant(user.id)
-            try:
-                await user.send(f"Thanks for registering for {config.EVENT_NAME} - See you there! 🎉")
-            except:
-                pass
-        elif str(reaction.emoji) == "❌":
-            data.add_no_participant(user.id)
-        elif str(reaction.emoji) == "❔":
-            data.add_maybe_participant(user.id)
+    option = NUMBER_EMOJI_INDEX.get(emoji)
+    if option is not None and option < tally_options(payload.message_id):
+        if ranked_ballots(payload.message_id):
+            data.record_vote(payload.message_id, payload.user_id, option, ranked=True)
+        else:
+            data.add_choice(payload.message_id, payload.user_id, option)
+        vote_embeds.notify(payload.message_id)
 
 @bot.event
-async def on_reaction_remove(reaction, user):
-    if user.bot:
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    emoji = str(payload.emoji)
+    if payload.message_id == data.reminder_message_id:
+        status = REGISTER_STATUS.get(emoji)
+        if status is not None and data.participant_status(payload.user_id) == status:
+            data.set_participant_status(payload.user_id, None)
         return
-    if reaction.message.id == data.reminder_message_id:
-        if str(reaction.emoji) == "✅":
-            data.remove_yes_participant(user.id)
-        elif str(reaction.emoji) == "❌":
-            data.remove_no_participant(user.id)
-        elif str(reaction.emoji) == "❔":
-            data.remove_maybe_participant(user.id)
-            # -------------------------
+    if data.voting_mode != "reactions":
+        return
+    option = NUMBER_EMOJI_INDEX.get(emoji)
+    if option is not None and option < tally_options(payload.message_id):
+        data.remove_vote(payload.message_id, payload.user_id, option)
+        vote_embeds.notify(payload.message_id)
+
+# -------------------------
 # /participants command
 # -------------------------
 @bot.tree.command(name="participants", description="Show who is attending")
 async def participants(interaction: discord.Interaction):
-    yes_users = [f"<@{uid}>" for uid in data.yes_participants]
-    no_users = [f"<@{uid}>" for uid in data.no_participants]
-    maybe_users = [f"<@{uid}>" for uid in data.maybe_participants]
-
-    embed = discord.Embed(title="Event Participants", color=discord.Color.blue())
-    embed.add_field(name="✅ Yes", value="\n".join(yes_users) or "None", inline=False)
-    embed.add_field(name="❌ No", value="\n".join(no_users) or "None", inline=False)
-    embed.add_field(name="❔ Maybe", value="\n".join(maybe_users) or "None", inline=False)
-    await interaction.response.send_message(embed=embed, ephemeral=False)
+    pages = render_cache.get("participants", data.version("participants"), lambda: create_participants_pages(
+        data.yes_participants, data.no_participants, data.maybe_participants
+    ))
+    await send_pages(interaction, pages)
 
 # -------------------------
 # /endvote command
 # -------------------------
-@bot.tree.command(name="endvote", description="End voting and announce winner (roles only)")
-async def endvote(interaction: discord.Interaction):
-    if not allowed(interaction):
-        await interaction.response.send_message("You don't have permission.", ephemeral=True)
-        return
+def result_details(result: voting.VoteResult, options: List[str]) -> str:
+    """Explain runoff rounds and automatic tie-breaks under the winner."""
+    lines = []
+    if result.method == "irv" and len(result.rounds) > 1:
+        lines.append(f"Won after {len(result.rounds)} instant-runoff rounds.")
+    if result.tiebreak:
+        tied = ", ".join(options[i] for i in result.tied)
+        how = "a random draw" if result.tiebreak == "draw" else f"most {result.tiebreak}"
+        lines.append(f"Tie between {tied} settled by {how}.")
+    return "\n".join(lines)
+
+async def close_vote(channel) -> str:
+    """Count the open vote and post the result in ``channel``; returns a status line."""
     if not data.vote_message_id:
-        await interaction.response.send_message("No active voting message.", ephemeral=True)
-        return
+        return "No active voting message."
 
-    try:
-        msg = await interaction.channel.fetch_message(data.vote_message_id)
-    except:
-        await interaction.response.send_message("Vote message not found.", ephemeral=True)
+    vote_message_id = data.vote_message_id
+    games = list(data.games)
+    result = await count_vote(channel, vote_message_id, len(games))
+    if result is None:
         data.vote_message_id = None
-        return
-
-    vote_counts = {}
-    number_emojis = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️⃣","8️⃣","9️⃣","🔟"]
-    for i, game in enumerate(data.games):
-        reaction = discord.utils.get(msg.reactions, emoji=number_emojis[i])
-        vote_counts[game] = reaction.count - 1 if reaction else 0
-
-    max_votes = max(vote_counts.values(), default=0)
-    winners = [g for g, v in vote_counts.items() if v == max_votes]
-    data.vote_message_id = None
+        return "Vote message not found."
+    scores = ", ".join(f"{float(score):g}" for score in result.scores)
+    logger.info(f"Vote {vote_message_id} counted by {result.method}: winner {result.winner}, scores [{scores}]")
+    with data.batch():
+        data.vote_message_id = None
+        data.clear_votes(vote_message_id)
+    reconciled_tallies.discard(vote_message_id)
+    vote_embeds.untrack(vote_message_id)
 
-    if len(winners) == 0:
+    if result.winner is None:
         embed = discord.Embed(
             title="No votes were cast 😢",
             description="Nobody voted, so no game was chosen.",
             color=discord.Color.dark_gray()
         )
-        await interaction.channel.send(embed=embed)
-    elif len(winners) == 1:
+        await channel.send(embed=embed)
+    elif len(result.tied) <= 1 or config.VOTING_AUTO_TIEBREAK:
+        description = f"**{games[result.winner]}** won the vote - See you at Variety Friday! 🎮"
+        details = result_details(result, games)
+        if details:
+            description += f"\n\n{details}"
         embed = discord.Embed(
             title="🏆 WE HAVE A WINNER! 🏆",
-            description=f"**{winners[0]}** won the vote - See you at Variety Friday! 🎮",
+            description=description,
             color=discord.Color.green()
         )
         embed.set_image(url="https://media1.giphy.com/media/v1.Y2lkPTZjMDliOTUyM2g0dWVqcnBpcTN1NGJzMDYyMnY4OHFwMXZiOHlyOXJ1MGQ2aTdwMCZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/blSTtZehjAZ8I/giphy.gif")
-        await interaction.channel.send(embed=embed)
+        await channel.send(embed=embed)
     else:
-        tied_games = winners.copy()
+        tied_games = [games[i] for i in result.tied]
         tied_games.append("All of them")
         tied_text = "\n".join(f"{i+1}. {g}" for i, g in enumerate(tied_games))
         embed = discord.Embed(
@@ -412,11 +839,27 @@ async def endvote(interaction: discord.Interaction):
             color=discord.Color.red()
         )
         embed.set_image(url="https://media0.giphy.com/media/v1.Y2lkPTZjMDliOTUya2pmcnM5Y25kcGprZmlhbnVycDlmNjIxa2FhYWFkYWI2czBzenRmcyZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/xT3i0VNrc6Ny7bxfJm/giphy.gif")
-        tie_msg = await interaction.channel.send(embed=embed)
-        for i in range(len(tied_games)):
-            await tie_msg.add_reaction(number_emojis[i])
-        data.tie_message_id = tie_msg.id
-        data.tie_options = tied_games
+        if data.voting_mode == "components":
+            tie_msg = await channel.send(embed=embed, view=VoteView(tied_games, record_component_vote))
+        else:
+            tie_msg = await channel.send(embed=embed)
+        reconciled_tallies.add(tie_msg.id)
+        with data.batch():
+            data.tie_options = tied_games
+            data.tie_channel_id = channel.id
+            data.tie_message_id = tie_msg.id
+        if data.voting_mode == "reactions":
+            reaction_seeder.seed(tie_msg, NUMBER_EMOJIS[:len(tied_games)])
+    return "Vote closed!"
+
+@bot.tree.command(name="endvote", description="End voting and announce winner (roles only)")
+async def endvote(interaction: discord.Interaction):
+    if not allowed(interaction):
+        await interaction.response.send_message("You don't have permission.", ephemeral=True)
+        return
+    # Exact tallies re-read every reaction, which can outlast the 3s window
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    await interaction.followup.send(await close_vote(interaction.channel), ephemeral=True)
 
 # -------------------------
 # /endtiebreak command
@@ -430,20 +873,16 @@ async def endtiebreak(interaction: discord.Interaction):
         await interaction.response.send_message("No active tiebreak voting.", ephemeral=True)
         return
 
-    try:
-        msg = await interaction.channel.fetch_message(data.tie_message_id)
-    except:
-        await interaction.response.send_message("Tiebreak vote message not found.", ephemeral=True)
+    # Exact tallies re-read every reaction, which can outlast the 3s window
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    tie_message_id = data.tie_message_id
+    result = await count_vote(interaction.channel, tie_message_id, len(data.tie_options))
+    if result is None:
+        await interaction.followup.send("Tiebreak vote message not found.", ephemeral=True)
         return
 
-    tie_counts = {}
-    number_emojis = ["1️⃣","2️⃣","3️⃣","4️⃣","5️⃣","6️⃣","7️⃣","8️⃣","9️⃣","🔟"]
-    for i, game in enumerate(data.tie_options):
-        reaction = discord.utils.get(msg.reactions, emoji=number_emojis[i])
-        tie_counts[game] = reaction.count - 1 if reaction else 0
-
-    max_votes = max(tie_counts.values(), default=0)
-    winners = [g for g, v in tie_counts.items() if v == max_votes]
+    # Everything level on top wins; with no votes at all, every option does
+    winners = [data.tie_options[i] for i in result.tied] or list(data.tie_options)
 
     if "All of them" in winners:
         winner_text = ", ".join([g for g in data.tie_options if g != "All of them"])
@@ -458,31 +897,137 @@ async def endtiebreak(interaction: discord.Interaction):
     embed.set_image(url="https://media1.giphy.com/media/v1.Y2lkPTZjMDliOTUyM2g0dWVqcnBpcTN1NGJzMDYyMnY4OHFwMXZiOHlyOXJ1MGQ2aTdwMCZlcD12MV9pbnRlcm5hbF9naWZfYnlfaWQmY3Q9Zw/blSTtZehjAZ8I/giphy.gif")
     await interaction.channel.send(embed=embed)
 
-    data.tie_message_id = None
-    data.tie_options = None
+    with data.batch():
+        data.tie_message_id = None
+        data.tie_options = None
+        data.clear_votes(tie_message_id)
+    reconciled_tallies.discard(tie_message_id)
+    await interaction.followup.send("Tiebreak closed!", ephemeral=True)
 
 # -------------------------
 # /startevent command
 # -------------------------
+async def announce_start(channel) -> DeliveryReport:
+    """Announce the start in ``channel`` and DM everyone who registered as attending."""
+    await channel.send(f"@everyone {config.EVENT_NAME} is starting now! 🎉")
+    return await dm_dispatcher.send_all(
+        data.yes_participants,
+        f"{config.EVENT_NAME} is starting now! See you there!",
+        guild=channel.guild,
+    )
+
 @bot.tree.command(name="startevent", description="Announce the start of the event")
 async def startevent(interaction: discord.Interaction):
     if not allowed(interaction):
         await interaction.response.send_message("You don't have permission to start the event.", ephemeral=True)
         return
 
-    yes_users = [f"<@{uid}>" for uid in data.yes_participants]
-    await interaction.channel.send(f"@everyone {config.EVENT_NAME} is starting now! 🎉")
-    for uid in data.yes_participants:
-        try:
-            user = await bot.fetch_user(uid)
-            if user:
-                await user.send(f"{config.EVENT_NAME} is starting now! See you there!")
-        except:
-            pass
+    await interaction.response.defer(ephemeral=True, thinking=True)
+
+    async def notify_attendees():
+        report = await announce_start(interaction.channel)
+        await interaction.followup.send(f"Event started announcements sent! DMs: {report.summary()}", ephemeral=True)
 
-    await interaction.response.send_message("Event started announcements sent!", ephemeral=True)
+    run_in_background(notify_attendees())
+
+# -------------------------
+# Automation
+# -------------------------
+async def start_event_in_background(channel) -> str:
+    async def notify_attendees():
+        report = await announce_start(channel)
+        logger.info(f"Scheduled start announcement sent; DMs: {report.summary()}")
+
+    run_in_background(notify_attendees())
+    return "Start announcement queued"
+
+# Each stage gets the schedule channel and the occurrence (event times) it belongs to
+STAGE_ACTIONS = {
+    "createevent": lambda channel, occurrence: create_events([occurrence]),
+    "register": lambda channel, occurrence: announce_event(channel),
+    "reminder": lambda channel, occurrence: announce_event(channel, reminder=True),
+    "startvote": lambda channel, occurrence: open_vote(channel),
+    "endvote": lambda channel, occurrence: close_vote(bot.get_channel(data.vote_channel_id or 0) or channel),
+    "startevent": lambda channel, occurrence: start_event_in_background(channel),
+}
+
+def scheduled_stage(name: str, minutes: float) -> Stage:
+    action = STAGE_ACTIONS[name]
+
+    async def run(occurrence: Occurrence):
+        channel = bot.get_channel(config.SCHEDULE_CHANNEL_ID)
+        if channel is None and name != "createevent":
+            logger.error(f"Scheduled {name} skipped: channel {config.SCHEDULE_CHANNEL_ID} not found")
+            return
+        logger.info(f"Scheduled {name}: {await action(channel, occurrence)}")
+
+    return Stage(name, datetime.timedelta(minutes=minutes), run)
+
+def build_stages() -> List[Stage]:
+    stages = []
+    for name, minutes in config.SCHEDULE_STAGES.items():
+        if name in STAGE_ACTIONS:
+            stages.append(scheduled_stage(name, minutes))
+        else:
+            logger.warning(f"Ignoring unknown scheduled stage {name!r}")
+    return stages
+
+scheduler = Scheduler(data, build_stages(), event_times)
+
+# -------------------------
+# /schedule command
+# -------------------------
+@bot.tree.command(name="schedule", description="Show the next automated event stages")
+async def schedule(interaction: discord.Interaction):
+    if not scheduler.running:
+        await interaction.response.send_message("Automation is off (SCHEDULE_ENABLED in config).", ephemeral=True)
+        return
+    lines = [
+        f"**{run.stage}** <t:{int(run.due.timestamp())}:F> (<t:{int(run.due.timestamp())}:R>)"
+        for run in scheduler.upcoming()
+    ]
+    embed = discord.Embed(
+        title="Upcoming automated stages",
+        description="\n".join(lines) or "Nothing scheduled.",
+        color=discord.Color.blue()
+    )
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+# -------------------------
+# /botstats command
+# -------------------------
+@bot.tree.command(name="botstats", description="Show command and handler latency stats (roles only)")
+async def botstats(interaction: discord.Interaction):
+    if not allowed(interaction):
+        await interaction.response.send_message("You don't have permission.", ephemeral=True)
+        return
+    sections = instrumentation.summary_sections() or [("No data yet", ["Nothing has been timed since startup."])]
+    await send_pages(interaction, paginate_fields("Bot latency stats", sections, discord.Color.blue()), ephemeral=True)
+
+# -------------------------
+# /profile command
+# -------------------------
+@bot.tree.command(name="profile", description="Start or stop the sampling profiler (roles only)")
+@app_commands.choices(action=[
+    app_commands.Choice(name="start", value="start"),
+    app_commands.Choice(name="stop", value="stop"),
+])
+async def profile(interaction: discord.Interaction, action: app_commands.Choice[str]):
+    if not allowed(interaction):
+        await interaction.response.send_message("You don't have permission.", ephemeral=True)
+        return
+    status, path = toggle_profiler(action.value)
+    if path is not None:
+        await interaction.response.send_message(status, file=discord.File(path), ephemeral=True)
+    else:
+        await interaction.response.send_message(status, ephemeral=True)
 
 # -------------------------
 # Run the bot
 # -------------------------
-bot.run(config.TOKEN)
+instrumentation.install(bot, bot.tree)
+
+try:
+    bot.run(config.TOKEN)
+finally:
+    data.flush()  # In case the bot stopped without VarietyBot.close (a no-op after it)
@@ -0,0 +1,127 @@
+"""Paginated embeds with navigation buttons, plus a version-keyed render cache."""
+import logging
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+FIELD_LIMIT = 1024     # Discord's cap on one field value
+FIELDS_PER_EMBED = 25
+EMBED_BUDGET = 5500    # Discord caps a whole embed at 6000 characters; leave room for title/footer
+
+def chunk_lines(lines: Sequence[str], limit: int = FIELD_LIMIT) -> List[str]:
+    """Join lines into newline-separated chunks of at most ``limit`` characters."""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in lines:
+        line = line[:limit]
+        if current and size + 1 + len(line) > limit:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        size += len(line) + (1 if current else 0)
+        current.append(line)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def paginate_fields(
+    title: str,
+    sections: Sequence[Tuple[str, Sequence[str]]],
+    color: discord.Color,
+    empty: str = "None",
+    inline: bool = False,
+) -> List[discord.Embed]:
+    """Lay out (name, lines) sections as embed fields across as many pages as needed.
+
+    Sections too long for one field continue in further fields, and pages
+    are packed up to Discord's field and character limits.
+    """
+    fields: List[Tuple[str, str]] = []
+    for name, lines in sections:
+        chunks = chunk_lines(lines) or [empty]
+        fields.append((name, chunks[0]))
+        fields.extend((f"{name} (cont.)", chunk) for chunk in chunks[1:])
+
+    pages: List[List[Tuple[str, str]]] = [[]]
+    size = len(title)
+    for name, value in fields:
+        cost = len(name) + len(value)
+        if pages[-1] and (len(pages[-1]) >= FIELDS_PER_EMBED or size + cost > EMBED_BUDGET):
+            pages.append([])
+            size = len(title)
+        pages[-1].append((name, value))
+        size += cost
+
+    embeds = []
+    for number, page in enumerate(pages, start=1):
+        embed = discord.Embed(title=title, color=color)
+        for name, value in page:
+            embed.add_field(name=name, value=value, inline=inline)
+        if len(pages) > 1:
+            embed.set_footer(text=f"Page {number}/{len(pages)}")
+        embeds.append(embed)
+    return embeds
+
+class RenderCache:
+    """Rendered pages keyed by name, reused until the state version moves on."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Tuple[Any, List[discord.Embed]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: Any, build: Callable[[], List[discord.Embed]]) -> List[discord.Embed]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        pages = build()
+        self._entries[key] = (version, pages)
+        return pages
+
+class PageView(discord.ui.View):
+    """Previous/next buttons that flip a message between pre-rendered pages."""
+
+    def __init__(self, pages: List[discord.Embed], timeout: float = 300):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.page = 0
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def _sync_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= len(self.pages) - 1
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        self.page = page
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.pages[page], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, max(self.page - 1, 0))
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, min(self.page + 1, len(self.pages) - 1))
+
+    async def on_timeout(self):
+        if self.message is None:
+            return
+        try:
+            await self.message.edit(view=None)
+        except discord.HTTPException:
+            pass
+
+async def send_pages(interaction: discord.Interaction, pages: List[discord.Embed], ephemeral: bool = False):
+    """Respond with the first page, adding navigation buttons if there are more."""
+    if len(pages) == 1:
+        await interaction.response.send_message(embed=pages[0], ephemeral=ephemeral)
+        return
+    view = PageView(pages)
+    await interaction.response.send_message(embed=pages[0], view=view, ephemeral=ephemeral)
+    view.message = await interaction.original_response()
@@ -0,0 +1,77 @@
+"""Role-based permission checks for the Variety Friday bot's admin commands."""
+import logging
+from typing import Dict, FrozenSet, Iterable
+
+import discord
+
+import config
+
+logger = logging.getLogger(__name__)
+
+class PermissionService:
+    """Decides who may run admin commands.
+
+    ``role_names`` are resolved to role IDs once per guild, and decisions
+    are cached per member, so a check is a dict lookup and at worst an ID
+    set intersection. Caches are dropped precisely: role create/update/delete
+    events reset the guild, member updates reset that member. Administrators
+    are always allowed.
+    """
+
+    def __init__(self, role_names: Iterable[str]):
+        self.role_names = frozenset(name.lower() for name in role_names)
+        self._role_ids: Dict[int, FrozenSet[int]] = {}
+        self._decisions: Dict[int, Dict[int, bool]] = {}
+
+    def allowed_role_ids(self, guild: discord.Guild) -> FrozenSet[int]:
+        role_ids = self._role_ids.get(guild.id)
+        if role_ids is None:
+            role_ids = frozenset(role.id for role in guild.roles if role.name.lower() in self.role_names)
+            self._role_ids[guild.id] = role_ids
+            logger.info(f"Resolved {len(role_ids)} allowed roles in {guild.name}")
+        return role_ids
+
+    def member_allowed(self, member: discord.Member) -> bool:
+        decisions = self._decisions.setdefault(member.guild.id, {})
+        decision = decisions.get(member.id)
+        if decision is None:
+            decision = member.guild_permissions.administrator or not self.allowed_role_ids(member.guild).isdisjoint(
+                role.id for role in member.roles
+            )
+            decisions[member.id] = decision
+        return decision
+
+    def is_allowed(self, interaction: discord.Interaction) -> bool:
+        """Check if the user behind an interaction may use admin commands."""
+        if interaction.guild is None:
+            return False
+        member = interaction.user
+        if not isinstance(member, discord.Member):
+            member = interaction.guild.get_member(member.id)
+        if member is None:
+            return False
+        return self.member_allowed(member)
+
+    # -------------------------
+    # Invalidation
+    # -------------------------
+    def reset_guild(self, guild: discord.Guild):
+        self._role_ids.pop(guild.id, None)
+        self._decisions.pop(guild.id, None)
+
+    def on_role_change(self, role: discord.Role):
+        """A role was created, deleted, renamed or had its permissions changed."""
+        self.reset_guild(role.guild)
+
+    def on_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name or before.permissions.administrator != after.permissions.administrator:
+            self.reset_guild(after.guild)
+
+    def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            self.forget_member(after.guild.id, after.id)
+
+    def forget_member(self, guild_id: int, user_id: int):
+        self._decisions.get(guild_id, {}).pop(user_id, None)
+
+permissions = PermissionService(config.ALLOWED_ROLES)
@@ -0,0 +1,144 @@
+"""Runtime sampling profiler and event-loop lag monitor for the Variety Friday bot."""
+import asyncio
+import datetime
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def _collapse(frame) -> str:
+    """One stack in collapsed format: root;...;leaf (module:function per frame)."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+class SamplingProfiler:
+    """Samples one thread's stack from a background thread.
+
+    Nothing runs on the profiled thread, so the cost to the event loop is
+    just the GIL hand-off each ``interval``. Samples are written in the
+    collapsed-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, output_dir: str = "profiles", interval: float = 0.005):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self._samples: Counter = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target: Optional[int] = None
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, thread_id: Optional[int] = None) -> bool:
+        """Start sampling ``thread_id`` (default: the calling thread). False if already running."""
+        if self.running:
+            return False
+        self._target = thread_id or threading.get_ident()
+        self._samples = Counter()
+        self._stop.clear()
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started ({self.interval * 1000:g}ms interval)")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._samples[_collapse(frame)] += 1
+
+    def stop(self) -> Optional[Path]:
+        """Stop sampling and write the collapsed stacks; returns the file path."""
+        if not self.running:
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        elapsed = time.monotonic() - self.started_at
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = self.output_dir / f"profile-{stamp}.collapsed"
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(f"Sampling profiler wrote {sum(self._samples.values())} samples over {elapsed:.1f}s to {path}")
+        return path
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self._samples.values())
+
+class LoopLagMonitor:
+    """Detects callbacks that block the event loop.
+
+    A task on the loop records a heartbeat every ``interval``. A watchdog
+    thread checks it and, once the loop has been stuck for longer than
+    ``threshold``, logs the loop thread's stack at that moment, which
+    points straight at the blocking call (a synchronous save, a CPU-heavy
+    loop, ...). The lag of every heartbeat is also tracked for metrics.
+    """
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1):
+        self.threshold = threshold
+        self.interval = interval
+        self.stats: Dict[str, float] = {"stalls": 0, "max_lag_seconds": 0.0, "last_lag_seconds": 0.0}
+        self._last_beat = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.create_task(self._beat())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _beat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(now - expected, 0.0)
+            self._last_beat = now
+            self.stats["last_lag_seconds"] = lag
+            self.stats["max_lag_seconds"] = max(self.stats["max_lag_seconds"], lag)
+
+    def _watch(self):
+        reported_beat = None
+        while not self._stop.wait(self.threshold / 2):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat  # One report per stall
+            self.stats["stalls"] += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "(unavailable)\n"
+            logger.warning(f"Event loop blocked for {stalled:.2f}s+; loop thread is in:\n{stack}")
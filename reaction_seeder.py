@@ -0,0 +1,61 @@
+"""Background reaction seeding for announcement and vote messages."""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Set
+
+import discord
+
+from utils import with_retries
+
+logger = logging.getLogger(__name__)
+
+class ReactionSeeder:
+    """Adds reactions to messages without blocking the calling command.
+
+    Each message's emojis are added strictly in order by one background
+    task. Adding reactions shares a rate-limit bucket per channel, so
+    seeding jobs in the same channel run one after another instead of
+    racing each other into 429s; jobs in different channels run in
+    parallel. Rate limits and server errors that still surface are retried
+    with backoff.
+    """
+
+    def __init__(self, retries: int = 3, backoff: float = 1.0):
+        self.retries = retries
+        self.backoff = backoff
+        self._channel_locks: Dict[int, asyncio.Lock] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def seed(self, message: discord.Message, emojis: Iterable[str]) -> asyncio.Task:
+        """Start adding ``emojis`` to ``message`` in order and return the task."""
+        task = asyncio.create_task(self._seed(message, list(emojis)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def _seed(self, message: discord.Message, emojis: List[str]):
+        lock = self._channel_locks.setdefault(message.channel.id, asyncio.Lock())
+        async with lock:
+            for emoji in emojis:
+                if not await self._add(message, emoji):
+                    logger.warning(f"Stopped seeding reactions on message {message.id} at {emoji}")
+                    return
+
+    async def _add(self, message: discord.Message, emoji: str) -> bool:
+        try:
+            await with_retries(lambda: message.add_reaction(emoji), self.retries, self.backoff)
+            return True
+        except discord.NotFound:
+            return False  # Message was deleted
+        except discord.HTTPException as e:
+            logger.error(f"Could not add {emoji} to message {message.id}: {e}")
+            return False
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,170 @@
+"""Rebuild reaction-driven state from Discord for the Variety Friday bot."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+MULTI_VOTE_POLICIES = ("first", "drop", "split")
+USERS_PER_PAGE = 100  # Page size discord.py uses for reaction.users()
+
+async def reaction_user_ids(reaction: discord.Reaction) -> Set[int]:
+    """Page through everyone (bots excluded) who added a reaction."""
+    return {user.id async for user in reaction.users(limit=None) if not user.bot}
+
+async def fetch_reaction_users(channel, message_id: int, emojis: List[str]) -> Optional[Dict[str, Set[int]]]:
+    """Fetch the users behind each tracked emoji on a message.
+
+    All emojis are paged concurrently. Returns None if the message is gone.
+    """
+    try:
+        msg = await channel.fetch_message(message_id)
+    except discord.HTTPException as e:
+        logger.warning(f"Could not fetch message {message_id}: {e}")
+        return None
+
+    reactions = [r for r in msg.reactions if str(r.emoji) in emojis]
+    user_sets = await asyncio.gather(*(reaction_user_ids(r) for r in reactions))
+    users_by_emoji = {emoji: set() for emoji in emojis}
+    for reaction, user_ids in zip(reactions, user_sets):
+        users_by_emoji[str(reaction.emoji)] = user_ids
+    return users_by_emoji
+
+@dataclass
+class ExactTally:
+    """Every user's choices on a vote message, with the time spent fetching them."""
+    choices: Dict[int, List[int]] = field(default_factory=dict)   # user_id -> options, lowest first
+    users_by_emoji: Dict[str, Set[int]] = field(default_factory=dict)
+    fetch_message: float = 0.0
+    per_emoji: Dict[str, Tuple[float, int, int]] = field(default_factory=dict)  # emoji -> (seconds, users, pages)
+    build: float = 0.0
+    total: float = 0.0
+
+    @property
+    def multi_voters(self) -> int:
+        return sum(1 for options in self.choices.values() if len(options) > 1)
+
+    def summary(self) -> str:
+        pages = sum(p for _, _, p in self.per_emoji.values())
+        slowest = max((s for s, _, _ in self.per_emoji.values()), default=0.0)
+        return (
+            f"{len(self.choices)} voters ({self.multi_voters} multi), {pages} pages over "
+            f"{len(self.per_emoji)} emojis; message {self.fetch_message * 1000:.0f}ms, "
+            f"users {slowest * 1000:.0f}ms (slowest emoji), build {self.build * 1000:.1f}ms, "
+            f"total {self.total * 1000:.0f}ms"
+        )
+
+async def _timed_user_ids(reaction: discord.Reaction) -> Tuple[Set[int], float]:
+    started = time.perf_counter()
+    user_ids = await reaction_user_ids(reaction)
+    return user_ids, time.perf_counter() - started
+
+async def fetch_exact_tally(channel, message_id: int, emojis: List[str]) -> Optional[ExactTally]:
+    """Page through the users of every option emoji concurrently.
+
+    Unlike ``reaction.count`` this excludes bots (including our own seeded
+    reaction) and knows when one person reacted to several options.
+    Returns None if the message is gone.
+    """
+    tally = ExactTally()
+    started = time.perf_counter()
+    try:
+        msg = await channel.fetch_message(message_id)
+    except discord.HTTPException as e:
+        logger.warning(f"Could not fetch message {message_id}: {e}")
+        return None
+    tally.fetch_message = time.perf_counter() - started
+
+    reactions = [r for r in msg.reactions if str(r.emoji) in emojis]
+    results = await asyncio.gather(*(_timed_user_ids(r) for r in reactions))
+
+    build_started = time.perf_counter()
+    users_by_emoji = tally.users_by_emoji
+    for reaction, (user_ids, elapsed) in zip(reactions, results):
+        users_by_emoji[str(reaction.emoji)] = user_ids
+        pages = max(1, -(-reaction.count // USERS_PER_PAGE))
+        tally.per_emoji[str(reaction.emoji)] = (elapsed, len(user_ids), pages)
+    tally.choices = choices_from_reactions(users_by_emoji, emojis)
+    tally.build = time.perf_counter() - build_started
+    tally.total = time.perf_counter() - started
+    return tally
+
+def apply_multi_vote_policy(choices: Dict[int, List[int]], policy: str) -> Dict[int, bytes]:
+    """Turn exact per-user choices into one-vote ballots.
+
+    ``first`` keeps each user's lowest option, ``drop`` discards users who
+    picked more than one option, and ``split`` keeps every option so the
+    count can share the user's vote between them.
+    """
+    if policy == "first":
+        return {user_id: bytes(options[:1]) for user_id, options in choices.items()}
+    if policy == "drop":
+        return {user_id: bytes(options) for user_id, options in choices.items() if len(options) == 1}
+    if policy == "split":
+        return {user_id: bytes(options) for user_id, options in choices.items()}
+    raise ValueError(f"Unknown multi-vote policy {policy!r}; expected one of {', '.join(MULTI_VOTE_POLICIES)}")
+
+def registration_delta(
+    users_by_emoji: Dict[str, Set[int]],
+    status_by_emoji: Dict[str, str],
+    current_status: Callable[[int], Optional[str]],
+    registered: Iterable[int],
+) -> Dict[int, Optional[str]]:
+    """Work out which participant statuses differ from the reactions.
+
+    A user whose stored status still has a matching reaction keeps it;
+    otherwise the first reacted emoji (in ``status_by_emoji`` order) wins.
+    Registered users with no reaction left map to None.
+    """
+    wanted: Dict[int, str] = {}
+    for emoji, status in status_by_emoji.items():
+        for user_id in users_by_emoji.get(emoji, ()):
+            if current_status(user_id) == status:
+                wanted[user_id] = status
+            else:
+                wanted.setdefault(user_id, status)
+
+    delta: Dict[int, Optional[str]] = {
+        user_id: status for user_id, status in wanted.items() if current_status(user_id) != status
+    }
+    for user_id in registered:
+        if user_id not in wanted:
+            delta[user_id] = None
+    return delta
+
+def choices_from_reactions(users_by_emoji: Dict[str, Set[int]], emojis: List[str]) -> Dict[int, List[int]]:
+    """Build a user_id -> reacted options map, lowest option first."""
+    choices: Dict[int, List[int]] = {}
+    for option, emoji in enumerate(emojis):
+        for user_id in users_by_emoji.get(emoji, ()):
+            choices.setdefault(user_id, []).append(option)
+    return choices
+
+def ballots_from_reactions(
+    users_by_emoji: Dict[str, Set[int]],
+    emojis: List[str],
+    current_ballot: Callable[[int], bytes],
+) -> Dict[int, bytes]:
+    """Build ranked ballots from reactions.
+
+    Reactions carry no order, so options already on a user's stored ballot
+    keep their rank and any others are appended in option order.
+    """
+    reacted: Dict[int, List[int]] = {}
+    for option, emoji in enumerate(emojis):
+        for user_id in users_by_emoji.get(emoji, ()):
+            reacted.setdefault(user_id, []).append(option)
+
+    ballots: Dict[int, bytes] = {}
+    for user_id, options in reacted.items():
+        kept = [option for option in current_ballot(user_id) if option in options]
+        ballots[user_id] = bytes(kept + [option for option in options if option not in kept])
+    return ballots
+
+def count_vote_changes(old: Dict[int, Any], new: Dict[int, Any]) -> int:
+    """Number of users whose vote or ballot differs between two tallies."""
+    return sum(1 for user_id in old.keys() | new.keys() if old.get(user_id) != new.get(user_id))
@@ -0,0 +1,91 @@
+"""Weekly event occurrence times for the Variety Friday bot."""
+import datetime
+from bisect import bisect_right
+from typing import List, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+import config
+
+WEEK = datetime.timedelta(days=7)
+
+class Occurrence(NamedTuple):
+    """One event: start and end in the event's timezone."""
+    start: datetime.datetime
+    end: datetime.datetime
+
+    @property
+    def start_utc(self) -> datetime.datetime:
+        return self.start.astimezone(datetime.timezone.utc)
+
+    @property
+    def end_utc(self) -> datetime.datetime:
+        return self.end.astimezone(datetime.timezone.utc)
+
+class WeeklyRecurrence:
+    """Occurrences of a weekly event at a fixed local wall-clock time.
+
+    Starts are built from the local date and hour, so they stay at e.g.
+    21:00 across DST changes; ends are the start plus ``duration`` of real
+    time (aware datetimes sharing a ZoneInfo add wall-clock time, so the
+    sum is done in UTC). Occurrences are computed once and cached for
+    ``horizon_weeks`` ahead of the latest query, so lookups are a bisect.
+    """
+
+    def __init__(self, weekday: int, hour: int, duration: datetime.timedelta, timezone: str, horizon_weeks: int = 8):
+        self.weekday = weekday
+        self.hour = hour
+        self.duration = duration
+        self.tz = ZoneInfo(timezone)
+        self.horizon_weeks = horizon_weeks
+        self._occurrences: List[Occurrence] = []
+        self._starts: List[datetime.datetime] = []  # UTC, parallel to _occurrences
+
+    def _occurrence_on(self, day: datetime.date) -> Occurrence:
+        start = datetime.datetime.combine(day, datetime.time(self.hour), tzinfo=self.tz)
+        end = (start.astimezone(datetime.timezone.utc) + self.duration).astimezone(self.tz)
+        return Occurrence(start, end)
+
+    def _first_day_before(self, moment: datetime.datetime) -> datetime.date:
+        """The event weekday in the week up to ``moment``'s local date (a safe place to start counting)."""
+        local = moment.astimezone(self.tz).date()
+        return local - datetime.timedelta(days=(local.weekday() - self.weekday) % 7)
+
+    def _ensure(self, after: datetime.datetime, count: int):
+        """Make sure the cache covers ``count`` occurrences after ``after`` plus the horizon."""
+        if not self._starts or not self._starts[0] <= after <= self._starts[-1]:
+            # Outside the cached range: start over from the query's week
+            self._occurrences.clear()
+            self._starts.clear()
+            day = self._first_day_before(after)
+        else:
+            day = self._occurrences[-1].start.date() + WEEK
+        horizon = after + WEEK * self.horizon_weeks
+        index = bisect_right(self._starts, after)
+        while len(self._starts) - index < count or self._starts[-1] < horizon:
+            occurrence = self._occurrence_on(day)
+            self._occurrences.append(occurrence)
+            self._starts.append(occurrence.start_utc)
+            day += WEEK
+        # Drop what has fallen a week behind the query; the cache only rolls forward
+        stale = bisect_right(self._starts, after - WEEK)
+        del self._occurrences[:stale]
+        del self._starts[:stale]
+
+    def upcoming(self, count: int, after: Optional[datetime.datetime] = None) -> List[Occurrence]:
+        """The next ``count`` occurrences starting strictly after ``after`` (default: now)."""
+        if after is None:
+            after = datetime.datetime.now(datetime.timezone.utc)
+        self._ensure(after, count)
+        index = bisect_right(self._starts, after)
+        return self._occurrences[index:index + count]
+
+    def next_after(self, after: Optional[datetime.datetime] = None) -> Occurrence:
+        return self.upcoming(1, after)[0]
+
+event_times = WeeklyRecurrence(
+    config.EVENT_WEEKDAY,
+    config.EVENT_START_HOUR,
+    datetime.timedelta(hours=config.EVENT_DURATION_HOURS),
+    config.TIMEZONE,
+    horizon_weeks=config.EVENT_HORIZON_WEEKS,
+)
@@ -0,0 +1,155 @@
+"""Timer-heap scheduler that runs the weekly event stages automatically."""
+import asyncio
+import datetime
+import heapq
+import logging
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from recurrence import Occurrence, WeeklyRecurrence
+
+logger = logging.getLogger(__name__)
+
+MAX_SLEEP = 6 * 3600  # Re-read the wall clock at least this often (suspend, clock changes)
+
+class Stage(NamedTuple):
+    """One recurring job, run once per event occurrence."""
+    name: str
+    offset: datetime.timedelta  # Relative to the event start (negative = before)
+    action: Callable[[Occurrence], Awaitable[None]]
+
+class ScheduledRun(NamedTuple):
+    due: datetime.datetime
+    stage: str
+    occurrence: Occurrence
+
+def utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+class Scheduler:
+    """Runs each stage at its offset from every event occurrence.
+
+    All stages share one heap and a single task that sleeps until the
+    earliest due time, so between stages the bot holds one pending timer no
+    matter how many stages exist. Occurrences come from the cached
+    ``recurrence`` rather than being recalculated per stage.
+
+    The occurrence each stage last ran for is persisted. After a restart the
+    latest stage whose deadline passed while the bot was offline runs
+    straight away, as long as that event hasn't ended yet; earlier stages of
+    the same event and older deadlines are skipped. A stage is marked as run
+    before its action starts, so a crash mid-action never repeats an
+    announcement.
+    """
+
+    def __init__(self, data, stages: List[Stage], recurrence: WeeklyRecurrence):
+        self.data = data
+        self.stages = {stage.name: stage for stage in stages}
+        self._order = {stage.name: i for i, stage in enumerate(stages)}
+        self.recurrence = recurrence
+        self._heap: List[Tuple[datetime.datetime, int, str, Occurrence]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Build the heap from the persisted state and start the timer task."""
+        if self._task is not None:
+            return
+        now = utcnow()
+        last_runs = self.data.schedule_runs
+        for name in self.stages:
+            last = last_runs.get(name)
+            if last is not None:
+                self._push(name, datetime.datetime.fromisoformat(last), now)
+            else:
+                # New stage: start with the next deadline rather than catching up
+                self._push(name, now - self.stages[name].offset, now)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Scheduler started with {len(self.stages)} stages; next: {self.describe_next()}")
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._heap.clear()
+
+    def _push(self, name: str, after: datetime.datetime, now: datetime.datetime):
+        """Queue ``name`` for the first occurrence after ``after`` that is still worth running."""
+        offset = self.stages[name].offset
+        occurrence = self.recurrence.next_after(after)
+        while occurrence.start_utc + offset <= now:
+            following = self.recurrence.next_after(occurrence.start_utc)
+            if following.start_utc + offset > now and now < occurrence.end_utc:
+                break  # Latest missed deadline and its event is still on: catch up
+            logger.warning(f"Skipping missed stage {name} for the event at {occurrence.start.isoformat()}")
+            occurrence = following
+        heapq.heappush(self._heap, (occurrence.start_utc + offset, self._order[name], name, occurrence))
+        self._wakeup.set()
+
+    def _take_due(self, now: datetime.datetime) -> List[Tuple[str, Occurrence]]:
+        """Pop every run that is due; of one event's overdue stages only the latest runs.
+
+        After downtime, running e.g. startvote and endvote back to back would
+        open and close the vote at once, so earlier stages are skipped.
+        Stages sharing the latest due time all run, in stage order.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap))
+        latest: Dict[datetime.datetime, datetime.datetime] = {}
+        for when, _, _, occurrence in due:
+            latest[occurrence.start_utc] = max(when, latest.get(occurrence.start_utc, when))
+
+        runs = []
+        for when, _, name, occurrence in due:
+            if when == latest[occurrence.start_utc]:
+                runs.append((name, occurrence))
+                continue
+            logger.warning(f"Skipping overdue stage {name} for the event at {occurrence.start.isoformat()}: a later stage is also due")
+            self.data.mark_scheduled_run(name, occurrence.start_utc.isoformat())
+            self._push(name, occurrence.start_utc, now)
+        return runs
+
+    async def _run(self):
+        while True:
+            runs = self._take_due(utcnow())
+            for name, occurrence in runs:
+                await self._fire(name, occurrence)
+                self._push(name, occurrence.start_utc, utcnow())
+            if runs:
+                continue  # Running them took time; something else may be due now
+
+            now = utcnow()
+            delay = MAX_SLEEP
+            if self._heap:
+                delay = min((self._heap[0][0] - now).total_seconds(), MAX_SLEEP)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, name: str, occurrence: Occurrence):
+        self.data.mark_scheduled_run(name, occurrence.start_utc.isoformat())
+        logger.info(f"Running scheduled stage {name} for the event at {occurrence.start.isoformat()}")
+        try:
+            await self.stages[name].action(occurrence)
+        except Exception as e:
+            logger.error(f"Scheduled stage {name} failed: {e}")
+
+    # -------------------------
+    # Inspection
+    # -------------------------
+    def upcoming(self, limit: Optional[int] = None) -> List[ScheduledRun]:
+        """Queued runs, soonest first."""
+        runs = [ScheduledRun(due, name, occurrence) for due, _, name, occurrence in sorted(self._heap)]
+        return runs[:limit] if limit is not None else runs
+
+    def describe_next(self) -> str:
+        runs = self.upcoming(1)
+        return f"{runs[0].stage} at {runs[0].due.isoformat()}" if runs else "nothing"
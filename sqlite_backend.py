@@ -0,0 +1,339 @@
+"""SQLite storage backend for the Variety Friday bot's DataManager."""
+import json
+import logging
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from game_catalog import game_key
+from voting import as_ballot
+
+logger = logging.getLogger(__name__)
+
+# Top-level keys that hold Discord message/event IDs get their own table.
+MESSAGE_KEYS = ("vote_message_id", "reminder_message_id", "tie_message_id", "last_event_id")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_games_name_lower ON games (name_lower);
+
+CREATE TABLE IF NOT EXISTS game_catalog (
+    name_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS participants (
+    event_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (event_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_participants_status ON participants (event_id, status);
+
+CREATE TABLE IF NOT EXISTS messages (
+    key TEXT PRIMARY KEY,
+    message_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_message_id ON messages (message_id);
+
+CREATE TABLE IF NOT EXISTS votes (
+    message_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    option INTEGER NOT NULL,
+    ranking BLOB,
+    PRIMARY KEY (message_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS dm_outbox (
+    id TEXT PRIMARY KEY,
+    job TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dm_delivered (
+    key TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SQLiteBackend:
+    """Persists DataManager mutations as single-row SQLite updates.
+
+    The connection lives on one dedicated worker thread and every call is
+    queued onto it, so the event loop never waits on disk. Participants are
+    keyed by event, so previous events stay queryable.
+    """
+
+    def __init__(self, db_file: str = "bot_data.db"):
+        self.db_file = Path(db_file)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._event_id = 0
+        self._submit(self._connect).result()
+
+    def _submit(self, fn, *args) -> Future:
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"SQLite storage error: {future.exception()}")
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.db_file)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(votes)")}
+        if "ranking" not in columns:
+            # Databases created before ranked ballots only stored one option
+            self._conn.execute("ALTER TABLE votes ADD COLUMN ranking BLOB")
+        for key in ("dm_outbox", "dm_delivered"):
+            # Older databases kept these as whole JSON lists in kv
+            row = self._conn.execute("SELECT value FROM kv WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._set(key, json.loads(row[0]))
+                self._conn.execute("DELETE FROM kv WHERE key = ?", (key,))
+        self._conn.commit()
+        logger.info(f"Opened SQLite storage at {self.db_file}")
+
+    # -------------------------
+    # Loading and migration
+    # -------------------------
+    def load(self) -> Dict[str, Any]:
+        """Return the current state in the same shape as bot_data.json."""
+        return self._submit(self._load).result()
+
+    def _load(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for key, value in self._conn.execute("SELECT key, value FROM kv"):
+            data[key] = json.loads(value)
+        for key, message_id in self._conn.execute("SELECT key, message_id FROM messages"):
+            data[key] = message_id
+        data["games"] = [name for (name,) in self._conn.execute("SELECT name FROM games ORDER BY position")]
+        data["game_catalog"] = [name for (name,) in self._conn.execute("SELECT name FROM game_catalog")]
+        data["dm_outbox"] = [json.loads(job) for (job,) in self._conn.execute("SELECT job FROM dm_outbox ORDER BY rowid")]
+        data["dm_delivered"] = [key for (key,) in self._conn.execute("SELECT key FROM dm_delivered")]
+
+        self._event_id = data.get("last_event_id") or 0
+        for status in ("yes", "no", "maybe"):
+            data[f"{status}_participants"] = [
+                user_id for (user_id,) in self._conn.execute(
+                    "SELECT user_id FROM participants WHERE event_id = ? AND status = ?",
+                    (self._event_id, status),
+                )
+            ]
+
+        data["votes"] = {}
+        for message_id, user_id, option, ranking in self._conn.execute(
+            "SELECT message_id, user_id, option, ranking FROM votes"
+        ):
+            data["votes"].setdefault(str(message_id), []).append([user_id, list(ranking or [option])])
+        return data
+
+    def import_json(self, json_file: Path, records: Iterable[Dict[str, Any]] = ()) -> bool:
+        """One-shot import of an existing bot_data.json.
+
+        ``records`` are mutation records written after that snapshot (a
+        leftover journal) and are applied on top of it in the same
+        transaction. Does nothing once an import has been recorded; returns
+        whether this call did the import.
+        """
+        return self._submit(self._import_json, Path(json_file), records).result()
+
+    def _import_json(self, json_file: Path, records: Iterable[Dict[str, Any]]) -> bool:
+        if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+            return False
+        if json_file.exists():
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, value in data.items():
+                if key.endswith("_participants") or key in ("votes", "game_catalog"):
+                    continue
+                self._set(key, value)
+            for status in ("yes", "no", "maybe"):
+                for user_id in data.get(f"{status}_participants", []):
+                    self._set_status(user_id, status)
+            for name in data.get("game_catalog", []) + data.get("games", []):
+                self._add_to_catalog(name)
+            for message_id, votes in data.get("votes", {}).items():
+                self._set_votes(int(message_id), votes)
+            logger.info(f"Imported {json_file} into {self.db_file}")
+        replayed = 0
+        for op in records:
+            self._apply_record(op)
+            replayed += 1
+        if replayed:
+            logger.info(f"Imported {replayed} journal records into {self.db_file}")
+        self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', 'true')")
+        self._conn.commit()
+        return True
+
+    # -------------------------
+    # Mutations
+    # -------------------------
+    def apply(self, op: Dict[str, Any]) -> Future:
+        """Queue one DataManager mutation record for the worker thread."""
+        return self._submit(self._apply, op)
+
+    def _apply(self, op: Dict[str, Any]):
+        if self._apply_record(op):
+            self._conn.commit()
+
+    def _apply_record(self, op: Dict[str, Any]) -> bool:
+        """Run one record's statements without committing; False if it was unknown."""
+        kind = op.get("op")
+        if kind == "set":
+            self._set(op["key"], op["value"])
+        elif kind == "status":
+            self._set_status(op["user_id"], op["status"])
+        elif kind == "clear_participants":
+            self._conn.execute("DELETE FROM participants WHERE event_id = ?", (self._event_id,))
+        elif kind == "catalog_add":
+            self._add_to_catalog(op["name"])
+        elif kind == "dm_job_add":
+            self._add_dm_job(op["job"])
+        elif kind == "dm_job_remove":
+            self._conn.execute("DELETE FROM dm_outbox WHERE id = ?", (op["id"],))
+        elif kind == "dm_delivered_add":
+            self._conn.execute("INSERT OR IGNORE INTO dm_delivered (key) VALUES (?)", (op["key"],))
+        elif kind == "dm_delivered_clear":
+            self._conn.execute("DELETE FROM dm_delivered")
+        elif kind == "ballot":
+            self._set_vote(op["message_id"], op["user_id"], as_ballot(op["ballot"]))
+        elif kind == "vote":
+            self._set_vote(op["message_id"], op["user_id"], as_ballot(op["option"]))
+        elif kind == "set_votes":
+            self._set_votes(op["message_id"], op["votes"])
+        else:
+            logger.warning(f"Ignoring unknown data record: {op}")
+            return False
+        return True
+
+    def _set(self, key: str, value: Any):
+        if key == "games":
+            self._set_games(value)
+        elif key == "dm_outbox":
+            self._conn.execute("DELETE FROM dm_outbox")
+            for job in value:
+                self._add_dm_job(job)
+        elif key == "dm_delivered":
+            self._conn.execute("DELETE FROM dm_delivered")
+            self._conn.executemany("INSERT OR IGNORE INTO dm_delivered (key) VALUES (?)", [(k,) for k in value])
+        elif key in MESSAGE_KEYS:
+            self._conn.execute(
+                "INSERT INTO messages (key, message_id) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET message_id = excluded.message_id",
+                (key, value),
+            )
+            if key == "last_event_id":
+                self._switch_event(value or 0)
+        else:
+            self._conn.execute(
+                "INSERT INTO kv (key, value) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value, ensure_ascii=False)),
+            )
+
+    def _set_games(self, games: List[str]):
+        # The list is capped at a handful of entries, so replace it wholesale.
+        self._conn.execute("DELETE FROM games")
+        self._conn.executemany(
+            "INSERT INTO games (position, name, name_lower) VALUES (?, ?, ?)",
+            [(i, name, name.lower()) for i, name in enumerate(games)],
+        )
+
+    def _add_dm_job(self, job: Dict[str, Any]):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dm_outbox (id, job) VALUES (?, ?)",
+            (job["id"], json.dumps(job, ensure_ascii=False)),
+        )
+
+    def _add_to_catalog(self, name: str):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO game_catalog (name_key, name) VALUES (?, ?)",
+            (game_key(name), name),
+        )
+
+    def _switch_event(self, event_id: int):
+        """Carry the current participants over to a new event ID.
+
+        DataManager keeps participants across /createevent, so the rows are
+        copied rather than moved; the old event's rows stay as history.
+        """
+        if event_id == self._event_id:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO participants (event_id, user_id, status) "
+            "SELECT ?, user_id, status FROM participants WHERE event_id = ?",
+            (event_id, self._event_id),
+        )
+        self._event_id = event_id
+
+    def _set_status(self, user_id: int, status: Optional[str]):
+        if status is None:
+            self._conn.execute(
+                "DELETE FROM participants WHERE event_id = ? AND user_id = ?",
+                (self._event_id, user_id),
+            )
+        else:
+            self._conn.execute(
+                "INSERT INTO participants (event_id, user_id, status) VALUES (?, ?, ?) "
+                "ON CONFLICT (event_id, user_id) DO UPDATE SET status = excluded.status",
+                (self._event_id, user_id, status),
+            )
+
+    def _set_vote(self, message_id: int, user_id: int, ballot: bytes):
+        if not ballot:
+            self._conn.execute(
+                "DELETE FROM votes WHERE message_id = ? AND user_id = ?",
+                (message_id, user_id),
+            )
+        else:
+            self._conn.execute(
+                "INSERT INTO votes (message_id, user_id, option, ranking) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (message_id, user_id) DO UPDATE "
+                "SET option = excluded.option, ranking = excluded.ranking",
+                (message_id, user_id, ballot[0], ballot),
+            )
+
+    def _set_votes(self, message_id: int, votes: List[List[Any]]):
+        self._conn.execute("DELETE FROM votes WHERE message_id = ?", (message_id,))
+        ballots = [(user_id, as_ballot(ballot)) for user_id, ballot in votes]
+        self._conn.executemany(
+            "INSERT INTO votes (message_id, user_id, option, ranking) VALUES (?, ?, ?, ?)",
+            [(message_id, user_id, ballot[0], ballot) for user_id, ballot in ballots if ballot],
+        )
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def flush(self) -> bool:
+        """Block until every queued write has been committed."""
+        try:
+            self._submit(lambda: None).result()
+            return True
+        except Exception as e:
+            logger.error(f"Error flushing {self.db_file}: {e}")
+            return False
+
+    def close(self):
+        self.flush()
+        self._submit(self._conn.close).result()
+        self._executor.shutdown(wait=True)
@@ -1,88 +1,84 @@
 """Utility functions for the Variety Friday Discord Bot."""
 import discord
-import datetime
+import asyncio
 import logging
-from zoneinfo import ZoneInfo
-from typing import Optional, List
+from typing import Awaitable, Callable, Iterable, Optional, List, TypeVar
 from discord import EntityType, PrivacyLevel
 
 import config
+from pagination import paginate_fields
+from permissions import permissions
+from recurrence import Occurrence, event_times
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 def is_allowed(interaction: discord.Interaction) -> bool:
     """Check if user has permission to use admin commands."""
-    # Ensure we have a guild member, not just a user
-    if not hasattr(interaction, 'guild') or not interaction.guild:
-        return False
-    
-    # Get the member from the guild
-    member = interaction.guild.get_member(interaction.user.id)
-    if not member:
-        return False
-    
-    # Check if user is an administrator
-    if member.guild_permissions.administrator:
-        return True
-    
-    # Check if user has required roles
-    user_roles = [r.name.lower() for r in member.roles]
-    return any(role.lower() in [r.lower() for r in config.ALLOWED_ROLES] for role in user_roles)
+    return permissions.is_allowed(interaction)
 
-async def create_variety_event(guild: discord.Guild) -> Optional[discord.ScheduledEvent]:
-    """Create a Variety Friday event."""
-    try:
-        # Find the voice channel
-        voice_channel = discord.utils.get(guild.voice_channels, name=config.VOICE_CHANNEL_NAME)
-        if not voice_channel:
-            logger.error(f"Voice channel '{config.VOICE_CHANNEL_NAME}' not found")
-            return None
-
-        # Calculate next Friday at 9 PM UK time
-        uk_tz = ZoneInfo(config.TIMEZONE)
-        now_uk = datetime.datetime.now(uk_tz)
-
-        # Calculate days until next Friday
-        days_ahead = 4 - now_uk.weekday()  # Friday is weekday 4
-        if days_ahead <= 0:
-            # If it's Friday and before 9 PM, schedule for today
-            if now_uk.weekday() == 4 and now_uk.hour < config.EVENT_START_HOUR:
-                days_ahead = 0
-            else:
-                # Otherwise, schedule for next Friday
-                days_ahead += 7
-
-        # Set the event time
-        friday_uk = now_uk + datetime.timedelta(days=days_ahead)
-        start_time_uk = friday_uk.replace(
-            hour=config.EVENT_START_HOUR, 
-            minute=0, 
-            second=0, 
-            microsecond=0
-        )
-        end_time_uk = start_time_uk + datetime.timedelta(hours=config.EVENT_DURATION_HOURS)
+async def create_variety_events(
+    guild: discord.Guild,
+    occurrences: Iterable[Occurrence],
+    retries: int = 3,
+    backoff: float = 1.0,
+) -> List[discord.ScheduledEvent]:
+    """Create the Variety Friday event for each occurrence, in order.
+    
+    Events already in the guild with the same name and start time are reused
+    instead of duplicated. Creates go out one at a time: they share a single
+    rate-limit bucket, so sending them concurrently would only queue them
+    inside discord.py, and 429s or server errors are retried with backoff.
+    Stops at the first failure, so the result is a prefix of ``occurrences``.
+    """
+    voice_channel = guild.get_channel(config.VOICE_CHANNEL_ID)
+    if not voice_channel:
+        logger.error(f"Voice channel {config.VOICE_CHANNEL_ID} not found")
+        return []
 
-        # Convert to UTC
-        start_time_utc = start_time_uk.astimezone(datetime.timezone.utc)
-        end_time_utc = end_time_uk.astimezone(datetime.timezone.utc)
+    existing = {e.start_time: e for e in guild.scheduled_events if e.name == config.EVENT_NAME}
+    events = []
+    for occurrence in occurrences:
+        event = existing.get(occurrence.start_utc)
+        if event is None:
+            event = await _create_event(guild, voice_channel, occurrence, retries, backoff)
+            if event is None:
+                break
+        events.append(event)
+    return events
 
-        # Create the event
-        event = await guild.create_scheduled_event(
-            name=config.EVENT_NAME,
-            description=config.EVENT_DESCRIPTION,
-            start_time=start_time_utc,
-            end_time=end_time_utc,
-            privacy_level=PrivacyLevel.guild_only,
-            entity_type=EntityType.voice,
-            channel=voice_channel
+async def _create_event(
+    guild: discord.Guild,
+    voice_channel: discord.VoiceChannel,
+    occurrence: Occurrence,
+    retries: int,
+    backoff: float,
+) -> Optional[discord.ScheduledEvent]:
+    try:
+        event = await with_retries(
+            lambda: guild.create_scheduled_event(
+                name=config.EVENT_NAME,
+                description=config.EVENT_DESCRIPTION,
+                start_time=occurrence.start_utc,
+                end_time=occurrence.end_utc,
+                privacy_level=PrivacyLevel.guild_only,
+                entity_type=EntityType.voice,
+                channel=voice_channel
+            ),
+            retries,
+            backoff,
         )
-        
-        logger.info(f"Created event: {event.name} at {start_time_uk}")
-        return event
-        
     except Exception as e:
-        logger.error(f"Failed to create event: {e}")
+        logger.error(f"Failed to create event for {occurrence.start}: {e}")
         return None
+    logger.info(f"Created event: {event.name} at {occurrence.start}")
+    return event
+
+async def create_variety_event(guild: discord.Guild, occurrence: Optional[Occurrence] = None) -> Optional[discord.ScheduledEvent]:
+    """Create a Variety Friday event (by default for the next occurrence)."""
+    events = await create_variety_events(guild, [occurrence or event_times.next_after()])
+    return events[0] if events else None
 
 async def delete_event_safely(guild: discord.Guild, event_id: Optional[int]) -> bool:
     """Safely delete an event by ID."""
@@ -103,10 +99,52 @@ def get_voting_emojis() -> List[str]:
     """Get the list of voting emojis."""
     return ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
 
-async def safe_send_dm(member: discord.Member, message: str) -> bool:
-    """Safely send a DM to a member."""
+def retry_delay(error: discord.HTTPException, attempt: int, backoff: float) -> Optional[float]:
+    """Seconds to wait before retrying a failed request, or None if it shouldn't be retried.
+    
+    Only rate limits (429) and server errors (5xx) are retried. A Retry-After
+    header from Discord wins over the exponential backoff.
+    """
+    if error.status != 429 and error.status < 500:
+        return None
+    retry_after = getattr(error.response, "headers", {}).get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return backoff * 2 ** attempt
+
+async def with_retries(
+    request: Callable[[], Awaitable[T]],
+    retries: int = 3,
+    backoff: float = 1.0,
+    on_retry: Optional[Callable[[discord.HTTPException, float], None]] = None,
+) -> T:
+    """Await ``request()``, calling it again after rate limits and server errors.
+    
+    ``request`` must build a fresh coroutine on every call. Waits come from
+    ``retry_delay``; ``on_retry`` is told about each one before sleeping.
+    Errors that aren't retryable, or the last one once ``retries`` run out,
+    are raised to the caller.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await request()
+        except discord.HTTPException as e:
+            delay = retry_delay(e, attempt, backoff)
+            if delay is None or attempt >= retries:
+                raise
+            if on_retry is not None:
+                on_retry(e, delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+async def safe_send_dm(member: discord.abc.User, message: str, retries: int = 0, backoff: float = 1.0) -> bool:
+    """Safely send a DM to a member, retrying rate limits and server errors."""
     try:
-        await member.send(message)
+        await with_retries(lambda: member.send(message), retries, backoff)
         return True
     except discord.HTTPException:
         logger.warning(f"Could not send DM to {member.display_name}")
@@ -115,30 +153,26 @@ async def safe_send_dm(member: discord.Member, message: str) -> bool:
         logger.error(f"Error sending DM to {member.display_name}: {e}")
         return False
 
-def create_games_embed(games: List[str], title: str = "🎮 Variety Friday Suggestions") -> discord.Embed:
-    """Create an embed for displaying games."""
+def create_games_pages(games: List[str], title: str = "🎮 Variety Friday Suggestions") -> List[discord.Embed]:
+    """Create paginated embeds listing the current games."""
     if not games:
-        return discord.Embed(
+        return [discord.Embed(
             title=title,
             description="📭 No games suggested yet.",
             color=discord.Color.blue()
-        )
-    
-    description = "\n".join(f"- {game}" for game in games)
-    return discord.Embed(
-        title=title,
-        description=description,
-        color=discord.Color.blue()
-    )
+        )]
+    lines = [f"{i+1}. {game}" for i, game in enumerate(games)]
+    return paginate_fields(title, [("Current games", lines)], discord.Color.blue())
 
-def create_participants_embed(yes_participants: List[str], no_participants: List[str]) -> discord.Embed:
-    """Create an embed for displaying participants."""
-    embed = discord.Embed(title="📋 Variety Friday Participants", color=discord.Color.teal())
-    
-    yes_list = "\n".join(yes_participants) if yes_participants else "Nobody yet"
-    no_list = "\n".join(no_participants) if no_participants else "Nobody yet"
-    
-    embed.add_field(name="✅ Attending", value=yes_list, inline=True)
-    embed.add_field(name="❌ Not Attending", value=no_list, inline=True)
-    
-    return embed
+def create_participants_pages(
+    yes_participants: Iterable[int],
+    no_participants: Iterable[int],
+    maybe_participants: Iterable[int],
+) -> List[discord.Embed]:
+    """Create paginated embeds of participant mentions, split to fit Discord's field limit."""
+    sections = [
+        ("✅ Yes", [f"<@{uid}>" for uid in yes_participants]),
+        ("❌ No", [f"<@{uid}>" for uid in no_participants]),
+        ("❔ Maybe", [f"<@{uid}>" for uid in maybe_participants]),
+    ]
+    return paginate_fields("Event Participants", sections, discord.Color.blue())
@@ -0,0 +1,219 @@
+"""Vote counting for the Variety Friday bot: plurality, approval and instant-runoff.
+
+Pure functions with no Discord or storage dependencies. A ballot is a
+compact ``bytes`` ranking of option indexes, most preferred first (any
+sequence of small ints is accepted); plurality only looks at the first
+entry and approval treats the ballot as a set.
+"""
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+METHODS = ("plurality", "approval", "irv")
+
+@dataclass
+class VoteResult:
+    """Outcome of one count."""
+    method: str
+    winner: Optional[int]           # None when no valid ballots were cast
+    scores: List[Union[int, Fraction]]  # Final per-option score (last round for IRV)
+    tied: List[int] = field(default_factory=list)    # Options level on top before the tie-break
+    tiebreak: Optional[str] = None  # What settled the tie, if there was one
+    rounds: List[List[int]] = field(default_factory=list)   # IRV per-round counts
+    eliminated: List[int] = field(default_factory=list)     # IRV elimination order
+    ballots: int = 0
+
+def as_ballot(value: Union[None, int, Sequence[int]]) -> bytes:
+    """Coerce a stored vote (legacy single option, list or bytes) into a ballot."""
+    if value is None:
+        return b""
+    if isinstance(value, int):
+        return bytes([value])
+    return bytes(value)
+
+def compact_ballots(ballots: Iterable[Sequence[int]], num_options: int) -> Counter:
+    """Group identical ballots, dropping out-of-range and repeated entries.
+
+    Counting then works per distinct ballot with a weight instead of per
+    voter, which matters when most people pick the same one or two games.
+    """
+    grouped: Counter = Counter()
+    for ballot in ballots:
+        seen = set()
+        cleaned = bytearray()
+        for option in ballot:
+            if 0 <= option < num_options and option not in seen:
+                seen.add(option)
+                cleaned.append(option)
+        if cleaned:
+            grouped[bytes(cleaned)] += 1
+    return grouped
+
+def _first_choices(grouped: Counter, num_options: int) -> List[int]:
+    counts = [0] * num_options
+    for ballot, weight in grouped.items():
+        counts[ballot[0]] += weight
+    return counts
+
+def _split_shares(grouped: Counter, num_options: int) -> List[Fraction]:
+    """Share each ballot's vote equally between every option on it."""
+    shares = [Fraction(0)] * num_options
+    for ballot, weight in grouped.items():
+        share = Fraction(weight, len(ballot))
+        for option in ballot:
+            shares[option] += share
+    return shares
+
+def _approvals(grouped: Counter, num_options: int) -> List[int]:
+    # Fold each distinct ballot into a bitmask once, then count set bits
+    masks: Counter = Counter()
+    for ballot, weight in grouped.items():
+        mask = 0
+        for option in ballot:
+            mask |= 1 << option
+        masks[mask] += weight
+    counts = [0] * num_options
+    for mask, weight in masks.items():
+        while mask:
+            low = mask & -mask
+            counts[low.bit_length() - 1] += weight
+            mask ^= low
+    return counts
+
+def _borda(grouped: Counter, num_options: int) -> List[int]:
+    """Points for rank: first place on a ballot gets num_options, second one less, ..."""
+    points = [0] * num_options
+    for ballot, weight in grouped.items():
+        for rank, option in enumerate(ballot):
+            points[option] += (num_options - rank) * weight
+    return points
+
+def _break_tie(
+    tied: List[int],
+    criteria: List[Tuple[str, List[int]]],
+    seed: int,
+    lowest: bool = False,
+) -> Tuple[int, str]:
+    """Narrow ``tied`` by each criterion in turn, falling back to a seeded draw.
+
+    Picks the highest score, or the lowest with ``lowest=True`` (used for
+    IRV eliminations). The draw is reproducible for a given seed.
+    """
+    candidates = sorted(tied)
+    for name, scores in criteria:
+        pick = min if lowest else max
+        best = pick(scores[option] for option in candidates)
+        narrowed = [option for option in candidates if scores[option] == best]
+        if len(narrowed) == 1:
+            return narrowed[0], name
+        candidates = narrowed
+    return random.Random(seed).choice(candidates), "draw"
+
+def _top(scores: List[int]) -> List[int]:
+    best = max(scores)
+    return [option for option, score in enumerate(scores) if score == best]
+
+def plurality(ballots: Iterable[Sequence[int]], num_options: int, seed: int = 0, split: bool = False) -> VoteResult:
+    """One vote per ballot for its first choice.
+
+    With ``split`` a ballot listing several options gives each an equal
+    fraction of its vote instead (exact ``Fraction`` scores, so ties stay exact).
+    """
+    grouped = compact_ballots(ballots, num_options)
+    scores = _split_shares(grouped, num_options) if split else _first_choices(grouped, num_options)
+    result = VoteResult("plurality", None, scores, ballots=sum(grouped.values()))
+    if result.ballots:
+        result.tied = _top(scores)
+        result.winner = result.tied[0]
+        if len(result.tied) > 1:
+            result.winner, result.tiebreak = _break_tie(
+                result.tied,
+                [("approvals", _approvals(grouped, num_options)), ("ranking points", _borda(grouped, num_options))],
+                seed,
+            )
+    return result
+
+def approval(ballots: Iterable[Sequence[int]], num_options: int, seed: int = 0) -> VoteResult:
+    """Every option on a ballot gets one vote."""
+    grouped = compact_ballots(ballots, num_options)
+    scores = _approvals(grouped, num_options)
+    result = VoteResult("approval", None, scores, ballots=sum(grouped.values()))
+    if result.ballots:
+        result.tied = _top(scores)
+        result.winner = result.tied[0]
+        if len(result.tied) > 1:
+            result.winner, result.tiebreak = _break_tie(
+                result.tied,
+                [("first choices", _first_choices(grouped, num_options)), ("ranking points", _borda(grouped, num_options))],
+                seed,
+            )
+    return result
+
+def instant_runoff(ballots: Iterable[Sequence[int]], num_options: int, seed: int = 0) -> VoteResult:
+    """Eliminate the weakest option until one has a majority of live ballots.
+
+    Each distinct ballot sits in the pile of its highest-ranked remaining
+    option. Eliminating an option only moves that option's pile, and a
+    ballot's position only ever moves forward, so the whole count touches
+    each ballot entry at most once instead of rescanning every round.
+    """
+    grouped = compact_ballots(ballots, num_options)
+    result = VoteResult("irv", None, [0] * num_options, ballots=sum(grouped.values()))
+    if not result.ballots:
+        return result
+
+    counts = [0] * num_options
+    piles: Dict[int, List[Tuple[bytes, int, int]]] = {option: [] for option in range(num_options)}
+    for ballot, weight in grouped.items():
+        piles[ballot[0]].append((ballot, weight, 0))
+        counts[ballot[0]] += weight
+
+    criteria = [("approvals", _approvals(grouped, num_options)), ("ranking points", _borda(grouped, num_options))]
+    remaining = set(range(num_options))
+    live = result.ballots
+    while True:
+        result.rounds.append([counts[o] if o in remaining else 0 for o in range(num_options)])
+        most = max(counts[o] for o in remaining)
+        leaders = [o for o in remaining if counts[o] == most]
+        if counts[leaders[0]] * 2 > live or len(remaining) == 1:
+            result.winner = leaders[0]
+            break
+        if len(remaining) == 2 and len(leaders) == 2:
+            # Dead heat between the last two: settle it like any other tie
+            result.tied = sorted(leaders)
+            result.winner, result.tiebreak = _break_tie(leaders, criteria, seed)
+            break
+
+        fewest = min(counts[o] for o in remaining)
+        weakest = [o for o in remaining if counts[o] == fewest]
+        loser = weakest[0]
+        if len(weakest) > 1:
+            loser, _ = _break_tie(weakest, criteria, seed, lowest=True)
+        remaining.discard(loser)
+        result.eliminated.append(loser)
+
+        for ballot, weight, pos in piles.pop(loser):
+            pos += 1
+            while pos < len(ballot) and ballot[pos] not in remaining:
+                pos += 1
+            if pos < len(ballot):
+                piles[ballot[pos]].append((ballot, weight, pos))
+                counts[ballot[pos]] += weight
+            else:
+                live -= weight  # Exhausted: no remaining option on this ballot
+        counts[loser] = 0
+
+    result.scores = result.rounds[-1]
+    return result
+
+COUNTERS = {"plurality": plurality, "approval": approval, "irv": instant_runoff}
+
+def tally(method: str, ballots: Iterable[Sequence[int]], num_options: int, seed: int = 0) -> VoteResult:
+    """Count ``ballots`` with the named method ("plurality", "approval" or "irv")."""
+    try:
+        counter = COUNTERS[method]
+    except KeyError:
+        raise ValueError(f"Unknown voting method {method!r}; expected one of {', '.join(METHODS)}") from None
+    return counter(ballots, num_options, seed)
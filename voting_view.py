@@ -0,0 +1,75 @@
+"""Component-based (select menu) voting for the Variety Friday bot."""
+from typing import Callable, List, Optional
+
+import discord
+
+OPTIONS_PER_SELECT = 25  # Discord's limit per select menu
+MAX_SELECTS = 5          # One select per action row
+MAX_OPTIONS = OPTIONS_PER_SELECT * MAX_SELECTS
+
+class VoteSelect(discord.ui.Select):
+    """One page of up to 25 vote options."""
+
+    def __init__(self, options: List[str], offset: int, page: int, pages: int):
+        placeholder = "Cast your vote"
+        if pages > 1:
+            placeholder += f" ({offset + 1}-{offset + len(options)})"
+        super().__init__(
+            custom_id=f"variety_vote:{page}",
+            placeholder=placeholder,
+            min_values=1,
+            max_values=1,
+            row=page,
+            options=[
+                discord.SelectOption(label=f"{offset + i + 1}. {name}"[:100], value=str(offset + i))
+                for i, name in enumerate(options)
+            ],
+        )
+
+    async def callback(self, interaction: discord.Interaction):
+        await self.view.record(interaction, int(self.values[0]))
+
+class VoteView(discord.ui.View):
+    """Persistent vote menu: one message send, votes arrive as interactions.
+
+    The custom IDs are stable, so after a restart the same view can be
+    re-attached with ``bot.add_view(view, message_id=...)``. ``on_vote`` is
+    called with (message_id, user_id, option) and returns the user's ballot
+    afterwards, or None once the vote has closed. With ``ranked`` each pick
+    adds to the user's ranking (picking an option again removes it);
+    otherwise a pick replaces the user's vote.
+    """
+
+    def __init__(
+        self,
+        options: List[str],
+        on_vote: Callable[[int, int, int], Optional[bytes]],
+        ranked: bool = False,
+    ):
+        super().__init__(timeout=None)
+        if len(options) > MAX_OPTIONS:
+            raise ValueError(f"At most {MAX_OPTIONS} vote options are supported")
+        self.options = options
+        self.on_vote = on_vote
+        self.ranked = ranked
+        pages = max(1, -(-len(options) // OPTIONS_PER_SELECT))
+        for page in range(pages):
+            offset = page * OPTIONS_PER_SELECT
+            self.add_item(VoteSelect(options[offset:offset + OPTIONS_PER_SELECT], offset, page, pages))
+
+    async def record(self, interaction: discord.Interaction, option: int):
+        ballot = self.on_vote(interaction.message.id, interaction.user.id, option)
+        if ballot is None:
+            await interaction.response.send_message("This vote has closed.", ephemeral=True)
+            return
+        if not self.ranked:
+            await interaction.response.send_message(
+                f"Vote recorded for **{self.options[option]}**. Pick again to change it.",
+                ephemeral=True
+            )
+            return
+        picks = "\n".join(f"{rank + 1}. {self.options[o]}" for rank, o in enumerate(ballot)) or "(empty)"
+        await interaction.response.send_message(
+            f"Your ballot:\n{picks}\nPick a game again to take it off.",
+            ephemeral=True
+        )